@@ -0,0 +1,10 @@
+import os
+import sys
+
+# Ensure src is in python path for relative imports to work from root execution
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kosdra.src.api.server import run_server
+
+if __name__ == "__main__":
+    run_server()
@@ -0,0 +1,274 @@
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+import numpy as np
+
+# In-process stand-in for the subset of the Cosdata REST API Kosdra uses:
+# auth, collection/index management, transactions, vector get, and
+# dense / tf-idf / hybrid search. Latency is configurable so benchmarks can
+# model a remote server.
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+class FakeCollection:
+    def __init__(self, name: str, dimension: int):
+        self.name = name
+        self.dimension = dimension
+        self.docs: Dict[str, Dict] = {}
+        self.staged: Dict[str, List[Dict]] = {}
+        self.lock = threading.RLock()
+        self._ids: List[str] = []
+        self._matrix = np.zeros((0, dimension), dtype=np.float32)
+        self._postings = defaultdict(dict)
+        self._doc_len: Dict[str, int] = {}
+        self._dirty = False
+
+    def upsert(self, vectors: List[Dict]):
+        with self.lock:
+            for v in vectors:
+                vid = str(v["id"])
+                old = self.docs.get(vid)
+                if old is not None:
+                    for tok in set(_tokenize(old.get("text"))):
+                        self._postings[tok].pop(vid, None)
+                self.docs[vid] = v
+                toks = _tokenize(v.get("text"))
+                self._doc_len[vid] = len(toks)
+                for tok, tf in Counter(toks).items():
+                    self._postings[tok][vid] = tf
+            self._dirty = True
+
+    def _dense_index(self):
+        with self.lock:
+            if self._dirty:
+                self._ids = list(self.docs)
+                mat = np.asarray([self.docs[i].get("dense_values") or [0.0] * self.dimension for i in self._ids], dtype=np.float32)
+                if len(mat):
+                    mat /= np.linalg.norm(mat, axis=1, keepdims=True) + 1e-12
+                self._matrix = mat.reshape(len(self._ids), self.dimension)
+                self._dirty = False
+            return self._ids, self._matrix
+
+    def dense(self, vector: List[float], top_k: int):
+        ids, mat = self._dense_index()
+        if not ids:
+            return []
+        q = np.asarray(vector, dtype=np.float32)
+        q /= np.linalg.norm(q) + 1e-12
+        scores = mat @ q
+        k = min(top_k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(ids[i], float(scores[i])) for i in top]
+
+    def tf_idf(self, query: str, top_k: int, k1: float = 1.5, b: float = 0.75):
+        with self.lock:
+            n = len(self.docs) or 1
+            avg_len = (sum(self._doc_len.values()) / n) or 1.0
+            scores = defaultdict(float)
+            for tok in set(_tokenize(query)):
+                postings = self._postings.get(tok)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for vid, tf in postings.items():
+                    norm = tf + k1 * (1 - b + b * self._doc_len[vid] / avg_len)
+                    scores[vid] += idf * tf * (k1 + 1) / norm
+        return sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:top_k]
+
+    def hybrid(self, vector, query: str, top_k: int, fusion_k: float):
+        depth = max(top_k * 2, 50)
+        fused = defaultdict(float)
+        for ranked in (self.dense(vector, depth) if vector else [], self.tf_idf(query, depth) if query else []):
+            for rank, (vid, _) in enumerate(ranked):
+                fused[vid] += 1.0 / (fusion_k + rank + 1)
+        return sorted(fused.items(), key=lambda kv: kv[1], reverse=True)[:top_k]
+
+    def result(self, vid: str, score: float, raw_text: bool) -> Dict:
+        doc = self.docs.get(vid, {})
+        out = {"id": vid, "document_id": doc.get("document_id"), "score": score, "metadata": doc.get("metadata") or {}}
+        if raw_text:
+            out["text"] = doc.get("text")
+        return out
+
+
+class FakeCosdataState:
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.collections: Dict[str, FakeCollection] = {}
+        self.lock = threading.Lock()
+        self.requests = Counter()
+
+    def sleep(self):
+        delay = self.latency_ms + (random.random() * self.jitter_ms if self.jitter_ms else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+    def load(self, name: str, vectors: List[Dict], dimension: int = 384):
+        # Bulk-load without going through HTTP (benchmark setup)
+        with self.lock:
+            col = self.collections.setdefault(name, FakeCollection(name, dimension))
+        col.upsert(vectors)
+        return col
+
+
+def _make_handler(state: FakeCosdataState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes on a keep-alive socket;
+        # with Nagle on, delayed ACKs add ~40 ms to every response
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def _body(self) -> Dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+        def _send(self, status: int, payload=None):
+            data = b"" if payload is None else json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            if data and self.command != "HEAD":
+                self.wfile.write(data)
+
+        def _route(self, method: str):
+            state.sleep()
+            path = self.path.split("?", 1)[0].rstrip("/")
+            route = re.sub(r"/(collections|transactions|vectors)/[^/]+", r"/\1/*", path)
+            state.requests[(method, route)] += 1
+            if path == "/health":
+                return self._send(200, {"status": "ok"})
+            if path == "/auth/create-session" and method == "POST":
+                return self._send(200, {"access_token": "fake-token", "created_at": time.time()})
+            parts = path.split("/")[1:]
+            if parts[:2] != ["vectordb", "collections"]:
+                return self._send(404, {"error": "not found"})
+            parts = parts[2:]
+            if not parts:
+                if method == "POST":
+                    body = self._body()
+                    dim = (body.get("dense_vector") or {}).get("dimension") or 384
+                    with state.lock:
+                        state.collections[body["name"]] = FakeCollection(body["name"], dim)
+                    return self._send(201, {"id": body["name"], "name": body["name"]})
+                return self._send(200, [{"name": n} for n in state.collections])
+            col = state.collections.get(parts[0])
+            if col is None:
+                return self._send(404, {"error": f"collection {parts[0]} not found"})
+            rest = parts[1:]
+            if not rest:
+                if method == "DELETE":
+                    with state.lock:
+                        state.collections.pop(col.name, None)
+                    return self._send(204)
+                return self._send(200, {"name": col.name, "dimension": col.dimension, "vector_count": len(col.docs)})
+            if rest[0] == "indexes":
+                return self._send(201, {})
+            if rest[0] == "transactions":
+                if len(rest) == 1:
+                    tid = uuid.uuid4().hex
+                    col.staged[tid] = []
+                    return self._send(200, {"transaction_id": tid})
+                tid, action = rest[1], (rest[2] if len(rest) > 2 else "")
+                if action == "upsert":
+                    col.staged.setdefault(tid, []).extend(self._body().get("vectors") or [])
+                    return self._send(200, {})
+                if action == "commit":
+                    col.upsert(col.staged.pop(tid, []))
+                    return self._send(204)
+                if action == "abort":
+                    col.staged.pop(tid, None)
+                    return self._send(204)
+                if action == "status":
+                    return self._send(200, {"status": "complete"})
+            if rest[0] == "vectors" and len(rest) == 2:
+                doc = col.docs.get(rest[1])
+                if doc is None:
+                    return self._send(404, {"error": "vector not found"})
+                return self._send(200, {"id": rest[1], "document_id": doc.get("document_id"), "dense_values": doc.get("dense_values"), "text": doc.get("text"), "metadata": doc.get("metadata")})
+            if rest[0] == "search" and len(rest) == 2:
+                body = self._body()
+                raw = bool(body.get("return_raw_text"))
+                top_k = int(body.get("top_k") or 10)
+                kind = rest[1]
+                if kind == "dense":
+                    hits = col.dense(body.get("query_vector") or [], top_k)
+                elif kind == "tf-idf":
+                    hits = col.tf_idf(body.get("query") or "", top_k)
+                elif kind == "hybrid":
+                    vec, text = None, ""
+                    for q in body.get("queries") or []:
+                        vec = (q.get("dense") or {}).get("vector", vec)
+                        text = (q.get("tf-idf") or {}).get("query", text)
+                    hits = col.hybrid(vec, text, top_k, float(body.get("fusion_constant_k") or 60.0))
+                elif kind == "batch-tf-idf":
+                    return self._send(200, [{"results": [col.result(v, s, raw) for v, s in col.tf_idf(q, top_k)]} for q in body.get("queries") or []])
+                elif kind == "batch-dense":
+                    return self._send(200, [{"results": [col.result(v, s, raw) for v, s in col.dense(q.get("vector") or [], top_k)]} for q in body.get("queries") or []])
+                else:
+                    return self._send(404, {"error": f"unsupported search {kind}"})
+                return self._send(200, {"results": [col.result(v, s, raw) for v, s in hits]})
+            return self._send(404, {"error": "not found"})
+
+        def do_GET(self):
+            self._route("GET")
+
+        def do_HEAD(self):
+            self._route("HEAD")
+
+        def do_POST(self):
+            self._route("POST")
+
+        def do_PUT(self):
+            self._route("PUT")
+
+        def do_DELETE(self):
+            self._route("DELETE")
+
+    return Handler
+
+
+def start_fake_server(host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0, jitter_ms: float = 0.0):
+    # Returns (server, state, base_url); the server runs on a daemon thread
+    state = FakeCosdataState(latency_ms=latency_ms, jitter_ms=jitter_ms)
+    server = ThreadingHTTPServer((host, port), _make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="fake-cosdata").start()
+    return server, state, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local Cosdata stand-in for benchmarks")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8443)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--jitter-ms", type=float, default=0.0)
+    args = ap.parse_args()
+    server, _, url = start_fake_server(args.host, args.port, args.latency_ms, args.jitter_ms)
+    print(f"🧪 Fake Cosdata listening on {url} (latency {args.latency_ms}ms ± {args.jitter_ms}ms)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
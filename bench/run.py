@@ -0,0 +1,214 @@
+import argparse
+import io
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+# Ensure python can find the 'kosdra' package from the root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from kosdra.bench.corpus import HashingEncoder, generate_candidates, generate_queries, hashed_vectors
+from kosdra.bench.fake_cosdata import start_fake_server
+
+COLLECTION = "kosdra_bench"
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"n": 0}
+    ordered = sorted(samples)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))] * 1000.0
+
+    return {
+        "n": len(ordered),
+        "p50_ms": round(pct(50), 2),
+        "p95_ms": round(pct(95), 2),
+        "p99_ms": round(pct(99), 2),
+        "max_ms": round(ordered[-1] * 1000.0, 2),
+    }
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024.0 * 1024.0) if sys.platform == "darwin" else rss / 1024.0, 1)
+
+
+def setup_environment(args):
+    # Must run before any kosdra.src import: settings and the DB client are module-level
+    server, state, url = start_fake_server(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms)
+    workdir = tempfile.mkdtemp(prefix="kosdra-bench-")
+    os.environ["COSDATA_HOST"] = url
+    os.environ["COLLECTION_NAME"] = COLLECTION
+    os.environ["DOC_STORE_PATH"] = os.path.join(workdir, "docs.sqlite3")
+    os.environ["EMBEDDING_CACHE_PATH"] = os.path.join(workdir, "embeddings.sqlite3")
+    os.environ["ANALYTICS_PATH"] = os.path.join(workdir, "analytics.sqlite3")
+    os.environ["JOBS_PATH"] = os.path.join(workdir, "jobs.sqlite3")
+    if args.no_cache:
+        os.environ["QUERY_CACHE_SIZE"] = "0"
+        os.environ["RESULT_CACHE_SIZE"] = "0"
+
+    from kosdra.src.services.embedder import EmbedderService
+    if not args.model:
+        EmbedderService._model = HashingEncoder()
+    return server, state
+
+
+def load_corpus(state, n: int, strip_text: bool = False):
+    docs = list(generate_candidates(n))
+    vecs = hashed_vectors([d["text"] for d in docs])
+    for d, v in zip(docs, vecs):
+        d["dense_values"] = v.tolist()
+    state.load(COLLECTION, docs)
+    return docs
+
+
+def scenario_search(args, state) -> Dict:
+    from kosdra.src.services.search import search_candidates
+
+    t0 = time.perf_counter()
+    load_corpus(state, args.docs)
+    load_s = time.perf_counter() - t0
+
+    unique = generate_queries(max(1, args.queries))
+    rng = random.Random(3)
+    workload = [rng.choice(unique[: max(1, len(unique) // 10)]) if rng.random() < args.repeat_ratio else q for q in unique]
+    filters = {"min_exp": 5, "visa": "US Citizen"} if args.filters else {}
+
+    search_candidates(workload[0], 0.5, filters, top_k=args.top_k)  # warm-up (model, pools)
+
+    def timed(q):
+        t = time.perf_counter()
+        res = search_candidates(q, 0.5, filters, top_k=args.top_k)
+        return time.perf_counter() - t, len(res)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        samples = list(pool.map(timed, workload))
+    wall = time.perf_counter() - t0
+    return {
+        "scenario": "search",
+        "docs": args.docs,
+        "corpus_load_s": round(load_s, 2),
+        "latency": percentiles([s for s, _ in samples]),
+        "qps": round(len(samples) / wall, 1) if wall else None,
+        "avg_results": round(sum(n for _, n in samples) / max(1, len(samples)), 1),
+        "server_requests": {f"{m} {p}": c for (m, p), c in state.requests.most_common(8)},
+    }
+
+
+class _Upload(io.BytesIO):
+    # Mimics Streamlit's UploadedFile for the batch upload path
+    def __init__(self, name: str, data: bytes, mime: str = "text/plain"):
+        super().__init__(data)
+        self.name = name
+        self.type = mime
+        self.size = len(data)
+
+
+def scenario_ingest(args, state) -> Dict:
+    # Mirrors "Process Batch" in ui/app.py: each upload batch is one background
+    # job (parse -> micro-batched embed -> chunked upsert), polled to completion
+    from kosdra.src.core.db_client import db
+    from kosdra.src.core.job_store import FINISHED, job_store
+    from kosdra.src.core.metrics import metrics
+    from kosdra.src.services.ingest_jobs import start_ingest_job
+
+    db.get_collection()
+    docs = list(generate_candidates(args.docs))
+    uploads = [
+        [_Upload(f"{d['id']}.txt", d["text"].encode("utf-8")) for d in docs[start:start + args.batch]]
+        for start in range(0, len(docs), args.batch)
+    ]
+
+    def run_jobs(batches) -> Dict:
+        totals = {"indexed": 0, "skipped": 0, "failed": 0}
+        t = time.perf_counter()
+        for files in batches:
+            for f in files:
+                f.seek(0)
+            job_id = start_ingest_job(files)
+            while (job_store.get(job_id) or {}).get("status") not in FINISHED:
+                time.sleep(0.02)
+            job = job_store.get(job_id)
+            if job["status"] != "completed":
+                raise RuntimeError(f"ingest job {job_id} {job['status']}: {job['message']}")
+            for k in totals:
+                totals[k] += job[k]
+        return {**totals, "wall_s": time.perf_counter() - t}
+
+    first = run_jobs(uploads)
+    timers = metrics.snapshot()["timers"]
+    # Re-uploading unchanged files exercises the dedupe / skip path
+    again = run_jobs(uploads[:1])
+    return {
+        "scenario": "ingest",
+        "docs": len(docs),
+        "jobs": len(uploads),
+        "docs_per_s": round(first["indexed"] / first["wall_s"], 1) if first["wall_s"] else None,
+        "indexed": first["indexed"],
+        "failed": first["failed"],
+        # Stage time summed across overlapping stage threads
+        **{f"{stage}_s": round(timers.get(f"ingest.{stage}", {}).get("sum_ms", 0.0) / 1000.0, 2) for stage in ("parse", "embed", "upsert", "poll")},
+        "reupload_docs_per_s": round(again["skipped"] / again["wall_s"], 1) if again["wall_s"] else None,
+    }
+
+
+def scenario_seed(args, state) -> Dict:
+    from kosdra.scripts.seed_db import run_seed
+
+    samples = []
+    for _ in range(args.repeat):
+        t = time.perf_counter()
+        run_seed()
+        samples.append(time.perf_counter() - t)
+    return {"scenario": "seed", "runs": percentiles(samples)}
+
+
+SCENARIOS = {"search": scenario_search, "ingest": scenario_ingest, "seed": scenario_seed}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Kosdra benchmarks against a local Cosdata stand-in")
+    ap.add_argument("scenario", choices=sorted(SCENARIOS) + ["all"])
+    ap.add_argument("--docs", type=int, default=10_000)
+    ap.add_argument("--queries", type=int, default=500)
+    ap.add_argument("--repeat-ratio", type=float, default=0.3, help="Share of queries that repeat an earlier JD")
+    ap.add_argument("--top-k", type=int, default=15)
+    ap.add_argument("--filters", action="store_true", help="Apply strict visa/min_exp filters")
+    ap.add_argument("--concurrency", type=int, default=1)
+    ap.add_argument("--batch", type=int, default=100, help="Files per upload batch (ingest)")
+    ap.add_argument("--repeat", type=int, default=3, help="Runs of the seed scenario")
+    ap.add_argument("--latency-ms", type=float, default=2.0)
+    ap.add_argument("--jitter-ms", type=float, default=1.0)
+    ap.add_argument("--model", action="store_true", help="Use the real embedding model instead of hashed vectors")
+    ap.add_argument("--no-cache", action="store_true")
+    ap.add_argument("--json", help="Also write the report to this path")
+    args = ap.parse_args()
+
+    server, state = setup_environment(args)
+    names = sorted(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    report = []
+    try:
+        for name in names:
+            result = SCENARIOS[name](args, state)
+            result["peak_rss_mb"] = peak_rss_mb()
+            report.append(result)
+            print(json.dumps(result, indent=2))
+    finally:
+        server.shutdown()
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(report, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import sys
+import os
+import argparse
+
+# Ensure python can find the 'kosdra' package from the root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from kosdra.src.config import settings
+from kosdra.src.core.db_client import db
+from kosdra.src.services.bulk_ingest import IngestCheckpoint, iter_directory, iter_manifest, run_bulk_ingest
+
+def print_progress(s):
+    rates = " · ".join(f"{stage} {rate if rate is not None else '-'}" for stage, rate in s["stage_docs_per_s"].items())
+    print(
+        f"⏱️ {s['elapsed_s']:>7}s  seen {s['seen']:,}  indexed {s['indexed']:,}  skipped {s['skipped']:,}  "
+        f"failed {s['failed']:,}  resumed {s['resumed']:,}  |  {s['docs_per_s']} docs/s  ({rates} docs/s)",
+        flush=True,
+    )
+
+def run_bulk_ingest_cli():
+    ap = argparse.ArgumentParser(description="Resumable bulk ingest of a resume archive (PDF/DOCX/TXT)")
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--dir", help="Directory to walk recursively")
+    src.add_argument("--manifest", help='JSONL of {"path"|"text", "id", "metadata"} or a file with one path per line')
+    ap.add_argument("--workers", type=int, default=settings.BULK_WORKERS, help="Parse/embed processes (0 = every core, 1 = inline)")
+    ap.add_argument("--task-size", type=int, default=settings.BULK_TASK_SIZE, help="Files per worker task")
+    ap.add_argument("--txn-mb", type=float, default=settings.BULK_TXN_BYTES / 1e6, help="Target upsert payload per transaction (MB)")
+    ap.add_argument("--txn-docs", type=int, default=settings.BULK_TXN_MAX_DOCS, help="Max documents per transaction")
+    ap.add_argument("--checkpoint", default=settings.BULK_CHECKPOINT_PATH, help="Progress file; rerun with the same one to resume")
+    ap.add_argument("--retry-failed", action="store_true", help="Retry files that failed in an earlier run")
+    ap.add_argument("--reset", action="store_true", help="Recreate the collection (and start a fresh checkpoint) first")
+    ap.add_argument("--report-every", type=float, default=10.0, help="Seconds between progress lines")
+    args = ap.parse_args()
+
+    if args.reset and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    try:
+        col = db.get_collection(reset=args.reset)
+    except Exception as e:
+        print(f"❌ Database connection failed: {e}")
+        sys.exit(1)
+
+    checkpoint = IngestCheckpoint(args.checkpoint)
+    sources = iter_directory(args.dir) if args.dir else iter_manifest(args.manifest)
+    print(f"📥 Bulk ingest from {args.dir or args.manifest} (checkpoint: {args.checkpoint})")
+    try:
+        final = run_bulk_ingest(
+            sources,
+            checkpoint,
+            workers=args.workers,
+            task_size=args.task_size,
+            txn_bytes=int(args.txn_mb * 1e6),
+            txn_docs=args.txn_docs,
+            retry_failed=args.retry_failed,
+            col=col,
+            report=print_progress,
+            report_every=args.report_every,
+        )
+    except KeyboardInterrupt:
+        print("\n⏸️ Interrupted. Rerun the same command to resume from the checkpoint.")
+        sys.exit(130)
+    print_progress(final)
+    print(f"✅ Indexed {final['indexed']:,} resumes in {final['transactions']:,} transactions ({final['skipped']:,} unchanged, {final['failed']:,} failed)")
+    if final["failed"]:
+        print(f"   Failed files are recorded in {args.checkpoint}; rerun with --retry-failed to try them again.")
+
+if __name__ == "__main__":
+    run_bulk_ingest_cli()
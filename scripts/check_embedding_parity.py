@@ -0,0 +1,48 @@
+import sys
+import os
+import time
+import argparse
+
+# Ensure python can find the 'kosdra' package from the root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from kosdra.src.config import settings
+from kosdra.src.services.embedding_backends import OnnxBackend, TorchBackend, check_parity, export_onnx
+
+SAMPLES = [
+    "Senior Python Engineer with PMP certification",
+    "DevOps expert. Terraform, AWS, Kubernetes. Asian Citizen available immediately.",
+    "PhD in Computer Vision. Published papers on Transformers. PyTorch expert.",
+    "Python Tech Lead. Mentors juniors. Good at system architecture.",
+    "Expert in AWS/Azure. 15 years experience. H1B Visa sponsorship required.",
+    "US Citizen with Top Secret Clearance",
+]
+
+def run_check():
+    ap = argparse.ArgumentParser(description="Export the ONNX embedding model and compare it with torch")
+    ap.add_argument("--fp32", action="store_true", help="Check the unquantized model instead of int8")
+    ap.add_argument("--min-cosine", type=float, default=0.98)
+    args = ap.parse_args()
+
+    quantize = not args.fp32
+    export_onnx(settings.EMBEDDING_MODEL, quantize=quantize)
+    onnx = OnnxBackend(settings.EMBEDDING_MODEL, quantize=quantize)
+    torch = TorchBackend(settings.EMBEDDING_MODEL)
+
+    report = check_parity(SAMPLES, candidate=onnx, reference=torch)
+    print(f"🔬 dim={report['dim']} min_cos={report['min_cosine']:.4f} mean_cos={report['mean_cosine']:.4f} norm_err={report['max_norm_error']:.2e}")
+
+    texts = SAMPLES * 32
+    for backend in (torch, onnx):
+        backend.encode(texts[:8])
+        start = time.perf_counter()
+        backend.encode(texts)
+        print(f"⏱️ {backend.name}: {len(texts) / (time.perf_counter() - start):.1f} texts/s")
+
+    if report["dim"] != 384 or report["min_cosine"] < args.min_cosine:
+        print("❌ Parity check failed: ONNX vectors are not interchangeable with the existing collection")
+        sys.exit(1)
+    print("✅ Parity check passed")
+
+if __name__ == "__main__":
+    run_check()
@@ -0,0 +1,53 @@
+import sys
+import os
+import json
+import time
+import argparse
+
+# Ensure python can find the 'kosdra' package from the root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from kosdra.src.services.export import DEFAULT_COLUMNS, FORMATS, PoolNotAuthoritative, export
+
+def run_export():
+    ap = argparse.ArgumentParser(description="Stream candidates to JSONL, CSV or Parquet")
+    ap.add_argument("out", help="Output file path")
+    ap.add_argument("--format", choices=FORMATS, help="Defaults to the output file extension")
+    ap.add_argument("--query", help="Export the ranked results of this query instead of the whole pool")
+    ap.add_argument("--filters", default="{}", help='Search filters as JSON, e.g. \'{"visa": "US Citizen", "min_exp": 5}\'')
+    ap.add_argument("--strictness", type=float, default=0.0)
+    ap.add_argument("--limit", type=int, help="Max rows (with --query: hits retrieved, default 1000)")
+    ap.add_argument("--columns", help=f"Comma-separated columns (default: {','.join(DEFAULT_COLUMNS)})")
+    ap.add_argument("--include-text", action="store_true", help="Add the full resume text column")
+    ap.add_argument("--allow-incomplete", action="store_true", help="Export this host's local store even if it does not match the collection (whole-pool exports)")
+    args = ap.parse_args()
+
+    fmt = args.format or os.path.splitext(args.out)[1].lstrip(".").lower()
+    if fmt not in FORMATS:
+        print(f"❌ Cannot infer format from '{args.out}'; pass --format {{{','.join(FORMATS)}}}")
+        sys.exit(1)
+    columns = [c.strip() for c in args.columns.split(",") if c.strip()] if args.columns else list(DEFAULT_COLUMNS)
+    if args.include_text and "text" not in columns:
+        columns.append("text")
+
+    print(f"📤 Exporting to {args.out} ({fmt})...")
+    start = time.perf_counter()
+    try:
+        n = export(
+            fmt,
+            args.out,
+            columns=columns,
+            query=args.query,
+            filters=json.loads(args.filters),
+            strictness=args.strictness,
+            limit=args.limit,
+            allow_incomplete=args.allow_incomplete,
+        )
+    except (ImportError, PoolNotAuthoritative) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Exported {n:,} candidates in {elapsed:.1f}s")
+
+if __name__ == "__main__":
+    run_export()
@@ -0,0 +1,37 @@
+import sys
+import os
+import time
+import argparse
+
+# Ensure python can find the 'kosdra' package from the root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from kosdra.src.core.analytics import analytics
+from kosdra.src.core.db_client import db
+from kosdra.src.core.doc_store import doc_store
+
+def run_rebuild():
+    ap = argparse.ArgumentParser(
+        description=(
+            "Recompute the dashboard aggregates in one streaming pass over this host's local document store. "
+            "Cosdata cannot list a collection, so this is NOT a rebuild from the collection: resumes that never "
+            "reached the local store (ingested from another host, or before the store existed) stay missing. "
+            "A warning is printed when the store's size differs from the collection's vector count."
+        )
+    )
+    ap.parse_args()
+
+    remote = db.vector_count()
+    local = len(doc_store)
+    if remote is None:
+        print("⚠️ Could not read the collection's vector count; the rebuild covers the local store only.")
+    elif remote != local:
+        print(f"⚠️ The local document store holds {local:,} resumes but the collection holds {remote:,}; the rebuild covers the local store only.")
+
+    print("📊 Rebuilding talent-pool analytics...")
+    start = time.perf_counter()
+    n = analytics.rebuild(doc_store.iter_all())
+    print(f"✅ Aggregated {n:,} candidates in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    run_rebuild()
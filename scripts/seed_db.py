@@ -6,7 +6,7 @@ import time
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from kosdra.src.core.db_client import db
-from kosdra.src.services.embedder import EmbedderService
+from kosdra.src.services.ingest import ingest_documents
 
 def run_seed():
     print("🌱 Seeding Kosdra Database...")
@@ -44,24 +44,12 @@ def run_seed():
         }
     ]
     
-    print("🧠 Embedding...")
-    texts = [c["text"] for c in candidates]
-    vectors = EmbedderService.encode_batch(texts)
-    
-    batch = []
-    for i, (cand, vec) in enumerate(zip(candidates, vectors)):
-        batch.append({
-            "id": f"seed-{i}",
-            "dense_values": vec,
-            "text": cand["text"],
-            "metadata": {**cand["meta"], "name": cand["name"], "role": cand["role"]}
-        })
-        
-    print("💾 Transacting...")
-    with col.transaction() as txn:
-        txn.batch_upsert_vectors(batch)
-    
-    txn.poll_completion(target_status="complete", max_attempts=10)
+    print("🧠 Embedding & Transacting...")
+    docs = [
+        {"text": cand["text"], "metadata": {**cand["meta"], "name": cand["name"], "role": cand["role"]}}
+        for cand in candidates
+    ]
+    ingest_documents(docs, col=col, wait=True)
     print("✅ Database Seeded!")
 
 if __name__ == "__main__":
@@ -0,0 +1,77 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, List
+from ..config import settings
+from ..services.embedder import EmbedderService
+
+
+class SingleFlight:
+    # Concurrent callers with the same key share one in-flight computation
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable]):
+        fut = self._inflight.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(fn())
+            self._inflight[key] = fut
+            fut.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one cancelled client doesn't cancel the shared work
+        return await asyncio.shield(fut)
+
+    def __len__(self):
+        return len(self._inflight)
+
+
+class EmbedBatcher:
+    # Collects query texts from concurrent requests for up to `max_wait_ms`
+    # (or `max_batch` texts) and embeds them in a single encode call.
+    def __init__(self, executor, max_batch: int | None = None, max_wait_ms: float | None = None):
+        self.executor = executor
+        self.max_batch = max_batch or settings.EMBED_BATCH_SIZE
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else settings.EMBED_BATCH_WAIT_MS) / 1000.0
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def embed(self, text: str) -> List[float]:
+        self.start()
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, fut))
+        return await fut
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            texts = [t for t, _ in batch]
+            try:
+                vecs = await loop.run_in_executor(self.executor, EmbedderService.encode_queries, texts)
+                for (_, fut), vec in zip(batch, vecs):
+                    if not fut.done():
+                        fut.set_result(vec)
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
@@ -0,0 +1,276 @@
+import asyncio
+import csv
+import io
+import json
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web
+from ..config import settings
+from ..core.db_client import db
+from ..core.metrics import metrics
+from ..services.embedder import EmbedderService
+from ..services.export import DEFAULT_COLUMNS, PoolNotAuthoritative, iter_export_rows, write_jsonl
+from ..services.ingest import ingest_documents
+from ..services.search import SearchDeadlineExceeded, search_candidates
+from .coalesce import EmbedBatcher, SingleFlight
+
+
+def _search_key(body: dict) -> str:
+    return json.dumps(
+        {k: body.get(k) for k in ("query", "strictness", "filters", "top_k", "fusion_k")},
+        sort_keys=True,
+    )
+
+
+async def _json_body(request: web.Request) -> dict:
+    # Malformed or non-object bodies are the client's fault, not a 500
+    try:
+        body = await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text="request body must be valid JSON")
+    if not isinstance(body, dict):
+        raise web.HTTPBadRequest(text="request body must be a JSON object")
+    return body
+
+
+def _number(body: dict, key: str, cast, low=None, high=None):
+    # Optional numeric field; None stays None so search defaults apply
+    value = body.get(key)
+    if value is None:
+        return None
+    try:
+        if isinstance(value, bool):
+            raise TypeError(key)
+        value = cast(value)
+    except (TypeError, ValueError):
+        raise web.HTTPBadRequest(text=f"{key} must be a number")
+    if value != value or (low is not None and value < low) or (high is not None and value > high):
+        raise web.HTTPBadRequest(text=f"{key} is out of range")
+    return value
+
+
+_FILTER_TEXT = ("visa", "clearance", "role_contains", "location_contains")
+_FILTER_LISTS = ("must", "exclude")
+
+
+def _filters(value, name: str = "filters") -> dict:
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        raise web.HTTPBadRequest(text=f"{name} must be an object")
+    for key in _FILTER_TEXT:
+        if value.get(key) is not None and not isinstance(value[key], str):
+            raise web.HTTPBadRequest(text=f"{name}.{key} must be a string")
+    for key in _FILTER_LISTS:
+        if value.get(key) is not None and not (isinstance(value[key], list) and all(isinstance(t, str) for t in value[key])):
+            raise web.HTTPBadRequest(text=f"{name}.{key} must be a list of strings")
+    _number(value, "min_exp", int)
+    _number(value, "min_score", float)
+    return value
+
+
+def _search_params(body: dict) -> dict:
+    # Coerced before any work starts, so a bad field is a 400 rather than a
+    # 500 (or a truncated batch stream)
+    strictness = _number(body, "strictness", float, 0.0, 1.0)
+    return {
+        "strictness": 0.5 if strictness is None else strictness,
+        "top_k": _number(body, "top_k", int, 1),
+        "fusion_k": _number(body, "fusion_k", float, 0.0),
+    }
+
+
+async def _stream_ndjson(request: web.Request, rows) -> web.StreamResponse:
+    resp = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+    await resp.prepare(request)
+    for row in rows:
+        await resp.write((json.dumps(row) + "\n").encode("utf-8"))
+    await resp.write_eof()
+    return resp
+
+
+async def _run_search(app: web.Application, body: dict):
+    # `body` has been through _search_params and _filters
+    vec = await app["batcher"].embed(body["query"])
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        app["executor"],
+        lambda: search_candidates(
+            body["query"],
+            body["strictness"],
+            body["filters"],
+            top_k=body["top_k"],
+            fusion_k=body["fusion_k"],
+            dense_vec=vec,
+        ),
+    )
+
+
+async def handle_search(request: web.Request) -> web.StreamResponse:
+    body = await _json_body(request)
+    if not isinstance(body.get("query"), str) or not body["query"].strip():
+        raise web.HTTPBadRequest(text="query is required")
+    body = {**body, **_search_params(body), "filters": _filters(body.get("filters"))}
+    app = request.app
+    try:
+        results = await app["singleflight"].do(_search_key(body), lambda: _run_search(app, body))
+    except SearchDeadlineExceeded as e:
+        raise web.HTTPGatewayTimeout(text=str(e))
+    return await _stream_ndjson(request, results)
+
+
+async def handle_search_batch(request: web.Request) -> web.StreamResponse:
+    body = await _json_body(request)
+    queries = body.get("queries") or []
+    filters = body.get("filters")
+    # Validated up front: once streaming starts, an error can only truncate the response
+    if not isinstance(queries, list) or not all(isinstance(q, str) and q.strip() for q in queries):
+        raise web.HTTPBadRequest(text="queries must be a list of non-empty strings")
+    if isinstance(filters, list):
+        if len(filters) != len(queries):
+            raise web.HTTPBadRequest(text="filters must be a single object or one object per query")
+        per_query = [_filters(f, f"filters[{i}]") for i, f in enumerate(filters)]
+    else:
+        per_query = [_filters(filters)] * len(queries)
+    params = _search_params(body)
+    app = request.app
+    resp = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+    await resp.prepare(request)
+
+    async def one(i: int, q: str):
+        sub = {**body, **params, "query": q, "filters": per_query[i]}
+        try:
+            results = await app["singleflight"].do(_search_key(sub), lambda: _run_search(app, sub))
+        except Exception as e:
+            # One failed query becomes an error line; the stream carries on
+            metrics.incr("errors", stage="search_batch")
+            return {"query_index": i, "error": str(e) or repr(e)}
+        return {"query_index": i, "results": results}
+
+    # Stream each query's results as soon as it finishes
+    for coro in asyncio.as_completed([one(i, q) for i, q in enumerate(queries)]):
+        await resp.write((json.dumps(await coro) + "\n").encode("utf-8"))
+    await resp.write_eof()
+    return resp
+
+
+async def handle_ingest(request: web.Request) -> web.Response:
+    body = await _json_body(request)
+    docs = body.get("documents") or []
+    if not isinstance(docs, list) or not all(isinstance(d, dict) for d in docs):
+        raise web.HTTPBadRequest(text="documents must be a list of objects")
+    docs = [d for d in docs if isinstance(d.get("text"), str) and d["text"].strip()]
+    if not docs:
+        raise web.HTTPBadRequest(text="documents with text are required")
+
+    def ingest():
+        return ingest_documents(
+            [{"id": d.get("id"), "text": d["text"], "metadata": d.get("metadata") or {}} for d in docs],
+            wait=bool(body.get("wait")),
+        )
+
+    try:
+        res = await asyncio.get_running_loop().run_in_executor(request.app["executor"], ingest)
+    except Exception as e:
+        raise web.HTTPServiceUnavailable(text=f"ingest failed: {e}")
+    return web.json_response(res)
+
+
+async def handle_export(request: web.Request) -> web.StreamResponse:
+    # Streams JSONL or CSV in 500-row pages. Whole-pool exports page through
+    # the local doc store (409 unless it matches the collection, or
+    # "allow_incomplete" is set); query exports retrieve widening windows
+    # without resume text and backfill it a page at a time.
+    body = await _json_body(request)
+    fmt = body.get("format") or "jsonl"
+    if fmt not in ("jsonl", "csv"):
+        raise web.HTTPBadRequest(text="format must be 'jsonl' or 'csv' (use the CLI for parquet)")
+    columns = body.get("columns") or DEFAULT_COLUMNS
+    if not isinstance(columns, list) or not all(isinstance(c, str) for c in columns):
+        raise web.HTTPBadRequest(text="columns must be a list of strings")
+    filters = _filters(body.get("filters"))
+    strictness = _number(body, "strictness", float, 0.0, 1.0) or 0.0
+    limit = _number(body, "limit", int, 1)
+    loop = asyncio.get_running_loop()
+    try:
+        rows = await loop.run_in_executor(request.app["executor"], lambda: iter_export_rows(
+            query=body.get("query"),
+            filters=filters,
+            strictness=strictness,
+            limit=limit,
+            columns=columns,
+            allow_incomplete=bool(body.get("allow_incomplete")),
+        ))
+    except PoolNotAuthoritative as e:
+        raise web.HTTPConflict(text=str(e))
+    resp = web.StreamResponse(headers={
+        "Content-Type": "application/x-ndjson" if fmt == "jsonl" else "text/csv",
+        "Content-Disposition": f'attachment; filename="candidates.{fmt}"',
+    })
+    await resp.prepare(request)
+    header = fmt == "csv"
+    while True:
+        page = await loop.run_in_executor(request.app["executor"], lambda: list(islice(rows, 500)))
+        if not page and not header:
+            break
+        buf = io.StringIO()
+        if fmt == "csv":
+            writer = csv.DictWriter(buf, fieldnames=columns, extrasaction="ignore")
+            if header:
+                writer.writeheader()
+                header = False
+            writer.writerows(page)
+        else:
+            write_jsonl(page, buf)
+        await resp.write(buf.getvalue().encode("utf-8"))
+        if not page:
+            break
+    await resp.write_eof()
+    return resp
+
+
+async def handle_health(request: web.Request) -> web.Response:
+    return web.json_response({
+        "status": "ok" if EmbedderService.is_ready() else "warming",
+        "inflight": len(request.app["singleflight"]),
+        "cosdata_breakers": db.breaker_states(),
+    })
+
+
+async def handle_metrics(request: web.Request) -> web.Response:
+    # Prometheus text exposition; ?format=json returns the raw snapshot
+    if request.query.get("format") == "json":
+        return web.json_response({**metrics.snapshot(), "last_trace": metrics.last_trace("search")})
+    return web.Response(text=metrics.render_prometheus(), content_type="text/plain")
+
+
+async def _on_startup(app: web.Application):
+    app["batcher"].start()
+    if settings.WARMUP_ON_START:
+        EmbedderService.warm_up(background=True)
+        db.warm_up(background=True)
+
+
+async def _on_cleanup(app: web.Application):
+    await app["batcher"].stop()
+    app["executor"].shutdown(wait=False)
+
+
+def create_app() -> web.Application:
+    app = web.Application()
+    app["executor"] = ThreadPoolExecutor(max_workers=settings.API_WORKERS, thread_name_prefix="kosdra-api")
+    app["singleflight"] = SingleFlight()
+    app["batcher"] = EmbedBatcher(app["executor"])
+    app.router.add_post("/search", handle_search)
+    app.router.add_post("/search/batch", handle_search_batch)
+    app.router.add_post("/ingest", handle_ingest)
+    app.router.add_post("/export", handle_export)
+    app.router.add_get("/health", handle_health)
+    app.router.add_get("/metrics", handle_metrics)
+    app.on_startup.append(_on_startup)
+    app.on_cleanup.append(_on_cleanup)
+    return app
+
+
+def run_server(host: str | None = None, port: int | None = None):
+    web.run_app(create_app(), host=host or settings.API_HOST, port=port or settings.API_PORT)
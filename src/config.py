@@ -7,11 +7,107 @@ class Settings(BaseSettings):
     COSDATA_PASS: str = "<Your-Admin-key>"
     COLLECTION_NAME: str = "kosdra_prod"
     EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    # Embedding backend: "torch" (sentence-transformers) or "onnx" (ONNX Runtime)
+    EMBEDDING_BACKEND: str = "torch"
+    EMBEDDING_THREADS: int = 0
+    EMBEDDING_MAX_LENGTH: int = 256
+    EMBEDDING_BATCH_SIZE: int = 32
+    ONNX_MODEL_DIR: str = ".kosdra/onnx"
+    ONNX_QUANTIZE: bool = True
     # Search defaults and feature flags
     DEFAULT_TOP_K: int = 15
     DEFAULT_FUSION_K: float = 60.0
     RELAX_ON_EMPTY: bool = False
+    # Hybrid fusion: "server" (one /search/hybrid call) or "client" (dense and
+    # TF-IDF legs fetched concurrently, cached separately and fused locally)
+    FUSION_MODE: str = "server"
+    # Client fusion: "rrf" (uses fusion_k) or "weighted" (min-max normalized scores)
+    FUSION_METHOD: str = "rrf"
+    FUSION_DENSE_WEIGHT: float = 0.5
+    # Send exact-match metadata predicates to Cosdata (needs a metadata schema)
+    FILTER_PUSHDOWN: bool = False
+    # Adaptive over-fetch when client-side filters can drop hits
+    OVERFETCH_FACTOR: float = 3.0
+    OVERFETCH_MAX: int = 200
+    # Minimum retrieval depth per query (the candidate pool): filter-only and top_k changes re-filter it locally (0 disables)
+    CANDIDATE_POOL_SIZE: int = 200
+    BATCH_SEARCH_CONCURRENCY: int = 8
+    # Headless API service (api.py)
+    API_HOST: str = "0.0.0.0"
+    API_PORT: int = 8080
+    API_WORKERS: int = 16
+    EMBED_BATCH_SIZE: int = 32
+    EMBED_BATCH_WAIT_MS: float = 5.0
     DEBUG: bool = False
+    # Load the model / connect to Cosdata in the background at startup
+    WARMUP_ON_START: bool = True
+    # Streamlit UI: cards per page and result sets kept per session
+    UI_PAGE_SIZE: int = 10
+    UI_SEARCH_CACHE_SIZE: int = 8
+    # In-process caches (size 0 disables)
+    QUERY_CACHE_SIZE: int = 1024
+    QUERY_CACHE_TTL: float = 3600.0
+    RESULT_CACHE_SIZE: int = 256
+    RESULT_CACHE_TTL: float = 300.0
+    # Cosdata transport
+    COSDATA_CONNECT_TIMEOUT: float = 3.0
+    COSDATA_READ_TIMEOUT: float = 30.0
+    COSDATA_POOL_SIZE: int = 16
+    COLLECTION_HANDLE_TTL: float = 60.0
+    COSDATA_RECONNECT_INTERVAL: float = 15.0
+    FETCH_CONCURRENCY: int = 8
+    # End-to-end search deadline in seconds (0 disables); the hybrid call gets
+    # SEARCH_HYBRID_SHARE of what is left, fallbacks and backfill the rest
+    SEARCH_DEADLINE: float = 2.5
+    SEARCH_HYBRID_SHARE: float = 0.7
+    # Hedged hybrid requests: a duplicate goes out once the first has taken
+    # longer than this percentile of recent latencies (0 disables)
+    HEDGE_PERCENTILE: float = 95.0
+    HEDGE_MIN_DELAY: float = 0.05
+    HEDGE_MIN_SAMPLES: int = 20
+    # Circuit breaker: open after N consecutive failures, probe again after RESET seconds
+    BREAKER_FAILURES: int = 5
+    BREAKER_RESET: float = 15.0
+    # Horizontal sharding: each document goes to one of COSDATA_SHARDS
+    # collections by a stable hash of its id. Shard i is "<COLLECTION_NAME>_<i>"
+    # on COSDATA_SHARD_HOSTS[i % n] (comma-separated, default COSDATA_HOST).
+    # Changing the shard count requires a re-ingest.
+    COSDATA_SHARDS: int = 1
+    COSDATA_SHARD_HOSTS: str = ""
+    # Local id -> text/metadata store used for result backfill
+    DOC_STORE_PATH: str = ".kosdra/docs.sqlite3"
+    # Persistent (content hash, model) -> vector cache; unchanged resumes skip the model
+    EMBEDDING_CACHE_PATH: str = ".kosdra/embeddings.sqlite3"
+    # Skill taxonomy JSON ({"version", "skills": [{"name", "aliases"}]}); empty uses the bundled one
+    SKILL_TAXONOMY_PATH: str = ""
+    # Talent-pool aggregates for the Dashboard tab, updated at ingest
+    ANALYTICS_PATH: str = ".kosdra/analytics.sqlite3"
+    # Local memory-mapped copy of the dense vectors (exact re-scoring + outage fallback)
+    VECTOR_MIRROR: bool = False
+    VECTOR_MIRROR_PATH: str = ".kosdra/mirror"
+    VECTOR_MIRROR_DTYPE: str = "int8"
+    VECTOR_MIRROR_BLOCK: int = 16384
+    # 0 keeps the server's fused order; >0 blends in the mirror's exact cosine
+    RERANK_DENSE_WEIGHT: float = 0.0
+    # Background ingestion jobs: stage queues are bounded so memory stays flat
+    JOBS_PATH: str = ".kosdra/jobs.sqlite3"
+    INGEST_QUEUE_SIZE: int = 64
+    INGEST_EMBED_BATCH: int = 32
+    INGEST_UPSERT_CHUNK: int = 256
+    INGEST_JOB_MAX_ERRORS: int = 50
+    INGEST_JOB_POLL_INTERVAL: float = 1.0
+    # Offline bulk loader (scripts/bulk_ingest.py); BULK_WORKERS=0 uses every core
+    BULK_WORKERS: int = 0
+    BULK_TASK_SIZE: int = 32
+    BULK_TXN_BYTES: int = 8_000_000
+    BULK_TXN_MAX_DOCS: int = 1000
+    BULK_CHECKPOINT_PATH: str = ".kosdra/bulk_ingest.sqlite3"
+    # Resume parsing (PARSE_WORKERS=0 uses every core, 1 parses inline)
+    PARSE_WORKERS: int = 0
+    PARSE_MAX_BYTES: int = 20_000_000
+    PARSE_MAX_PAGES: int = 50
+    PARSE_TIMEOUT: float = 30.0
+    PARSE_PAGES_PER_TASK: int = 16
 
     class Config:
         env_file = ".env"
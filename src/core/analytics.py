@@ -0,0 +1,161 @@
+import json
+import os
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List
+from ..config import settings
+from ..services.skills import get_taxonomy
+
+# Dimensions the Dashboard tab breaks the talent pool down by
+DIMENSIONS = ("skill", "location", "visa", "clearance", "experience")
+EXP_BUCKETS = ((0, 2, "0-2 yrs"), (3, 5, "3-5 yrs"), (6, 9, "6-9 yrs"), (10, None, "10+ yrs"))
+
+
+def exp_bucket(value) -> str:
+    try:
+        years = int(value)
+    except (TypeError, ValueError):
+        return "Unknown"
+    for low, high, label in EXP_BUCKETS:
+        if years >= low and (high is None or years <= high):
+            return label
+    return "Unknown"
+
+
+def _skills(meta: Dict, text: str) -> List[str]:
+    # Canonical names when the document carries current skill bits; older
+    # documents are matched against the taxonomy here
+    taxonomy = get_taxonomy()
+    bits = taxonomy.doc_bits(meta)
+    if bits is None:
+        bits = taxonomy.to_bits(taxonomy.find_ids(text))
+        raw = meta.get("skills") or []
+        if isinstance(raw, str):
+            raw = raw.split(",")
+        bits |= taxonomy.to_bits(taxonomy.ids_for_names(raw))
+    return taxonomy.names_for_bits(bits)
+
+
+def facets(item: Dict) -> Dict[str, List[str]]:
+    # The dashboard keys one document contributes to, per dimension
+    meta = item.get("metadata") or {}
+    return {
+        "skill": _skills(meta, item.get("text") or ""),
+        "location": [str(meta.get("location") or "Unknown").strip() or "Unknown"],
+        "visa": [str(meta.get("visa") or "Unknown")],
+        "clearance": [str(meta.get("clearance") or "None")],
+        "experience": [exp_bucket(meta.get("exp"))],
+    }
+
+
+class TalentAnalytics:
+    # Talent-pool aggregates maintained at ingest time. Each document's facets
+    # are remembered so re-indexing the same id moves its counts instead of
+    # double-counting. Reads come from an in-memory copy that is refreshed
+    # only when another process has committed (PRAGMA data_version).
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._version = None
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS counts (dim TEXT NOT NULL, key TEXT NOT NULL, n INTEGER NOT NULL, PRIMARY KEY (dim, key))"
+            )
+            self._conn.execute("CREATE TABLE IF NOT EXISTS doc_facets (id TEXT PRIMARY KEY, facets TEXT NOT NULL)")
+            self._conn.commit()
+
+    def apply(self, items: Iterable[Dict]):
+        items = {item["id"]: item for item in items if item.get("id")}
+        if not items:
+            return
+        with self._lock:
+            ids = list(items)
+            old = {}
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                old.update(self._conn.execute(f"SELECT id, facets FROM doc_facets WHERE id IN ({marks})", chunk).fetchall())
+            delta = Counter()
+            rows = []
+            for vid, item in items.items():
+                new = facets(item)
+                if vid in old:
+                    for dim, keys in json.loads(old[vid]).items():
+                        for key in keys:
+                            delta[(dim, key)] -= 1
+                else:
+                    delta[("total", "candidates")] += 1
+                for dim, keys in new.items():
+                    for key in keys:
+                        delta[(dim, key)] += 1
+                rows.append((vid, json.dumps(new)))
+            self._write_locked(delta, rows)
+
+    def _write_locked(self, delta: Counter, rows: List):
+        self._conn.executemany(
+            "INSERT INTO counts (dim, key, n) VALUES (?, ?, ?) ON CONFLICT(dim, key) DO UPDATE SET n = n + excluded.n",
+            [(dim, key, n) for (dim, key), n in delta.items() if n],
+        )
+        self._conn.execute("DELETE FROM counts WHERE n <= 0")
+        self._conn.executemany(
+            "INSERT INTO doc_facets (id, facets) VALUES (?, ?) ON CONFLICT(id) DO UPDATE SET facets = excluded.facets",
+            rows,
+        )
+        self._conn.commit()
+        self._snapshot = None
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        # {"total": {"candidates": n}, "skill": {...}, ...}; cheap on repeat calls
+        with self._lock:
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if self._snapshot is None or version != self._version:
+                out = defaultdict(dict)
+                for dim, key, n in self._conn.execute("SELECT dim, key, n FROM counts ORDER BY n DESC"):
+                    out[dim][key] = n
+                self._snapshot = dict(out)
+                self._version = version
+            return self._snapshot
+
+    def total(self) -> int:
+        return self.snapshot().get("total", {}).get("candidates", 0)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM counts")
+            self._conn.execute("DELETE FROM doc_facets")
+            self._conn.commit()
+            self._snapshot = None
+
+    def rebuild(self, items: Iterable[Dict], chunk: int = 1000) -> int:
+        # One streaming pass: aggregate in memory (bounded by distinct keys),
+        # facets are written out chunk by chunk
+        delta = Counter()
+        rows = []
+        seen = 0
+        with self._lock:
+            self._conn.execute("DELETE FROM counts")
+            self._conn.execute("DELETE FROM doc_facets")
+            for item in items:
+                if not item.get("id"):
+                    continue
+                new = facets(item)
+                delta[("total", "candidates")] += 1
+                for dim, keys in new.items():
+                    for key in keys:
+                        delta[(dim, key)] += 1
+                rows.append((item["id"], json.dumps(new)))
+                seen += 1
+                if len(rows) >= chunk:
+                    self._conn.executemany("INSERT OR REPLACE INTO doc_facets (id, facets) VALUES (?, ?)", rows)
+                    rows = []
+            self._write_locked(delta, rows)
+        return seen
+
+
+analytics = TalentAnalytics(settings.ANALYTICS_PATH)
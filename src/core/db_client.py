@@ -1,81 +1,198 @@
+import hashlib
+import heapq
 import time
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List
 import requests
+from requests.adapters import HTTPAdapter
 from ..config import settings
+from .analytics import analytics
+from .doc_store import doc_store
+from .vector_mirror import get_mirror
+from .metrics import metrics
+from .resilience import CircuitBreaker, bind_deadline, current_deadline, hedged_call
+from ..services.fusion import fuse
 
-class CosdataManager:
-    _instance = None
+class CosdataTransport:
+    # Pooled keep-alive HTTP session for the raw REST calls the SDK doesn't cover
+    def __init__(self, client):
+        self.client = client
+        self.timeout = (settings.COSDATA_CONNECT_TIMEOUT, settings.COSDATA_READ_TIMEOUT)
+        self.session = requests.Session()
+        self.session.verify = False
+        adapter = HTTPAdapter(
+            pool_connections=settings.COSDATA_POOL_SIZE,
+            pool_maxsize=settings.COSDATA_POOL_SIZE,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(CosdataManager, cls).__new__(cls)
-            try:
-                Client = None
-                # 1) Prefer bundled SDK if present
-                sdk_path = os.path.join(
-                    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
-                    "cosdata-sdk-python",
-                    "src",
-                )
-                if os.path.isdir(sdk_path):
-                    if sdk_path not in sys.path:
-                        sys.path.insert(0, sdk_path)
-                    try:
-                        from cosdata import Client as _Client
-                        Client = _Client
-                    except Exception:
-                        Client = None
-
-                # 2) Try installed cosdata_client
-                if Client is None:
-                    try:
-                        from cosdata_client import Client as _Client
-                        Client = _Client
-                    except Exception:
-                        Client = None
-
-                # 3) Try installed cosdata
-                if Client is None:
-                    try:
-                        from cosdata import Client as _Client
-                        Client = _Client
-                    except Exception:
-                        Client = None
-
-                if Client is None:
-                    raise ImportError("Unable to locate Cosdata Client class from any known package")
-                cls._instance.client = Client(
-                    host=settings.COSDATA_HOST,
+    def url(self, path: str) -> str:
+        return f"{self.client.base_url}/{path.lstrip('/')}"
+
+    def request(self, method: str, path: str, timeout=None, **kwargs):
+        headers = {**self.client._get_headers(), **kwargs.pop("headers", {})}
+        return self.session.request(method, self.url(path), headers=headers, timeout=timeout or self.timeout, **kwargs)
+
+    def get(self, path: str, **kwargs):
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs):
+        return self.request("POST", path, **kwargs)
+
+class CosdataShard:
+    # One collection on one Cosdata instance: its own client, pooled session,
+    # cached handle and circuit breaker. With COSDATA_SHARDS=1 this is simply
+    # COLLECTION_NAME on COSDATA_HOST.
+    def __init__(self, index: int, count: int, search_pool: ThreadPoolExecutor):
+        self.index = index
+        self.count = count
+        self.name = "cosdata" if count == 1 else f"cosdata-{index}"
+        # The connection is opened lazily on first use so importing this
+        # module (and rendering the UI) never blocks on the network.
+        self._client = None
+        self._transport = None
+        self._connected_at = None
+        self._last_attempt = 0.0
+        self._connect_lock = threading.Lock()
+        self._collection = None
+        self._collection_checked_at = 0.0
+        self._collection_lock = threading.Lock()
+        self._search_failed = False
+        self._search_pool = search_pool
+        self.breaker = CircuitBreaker(self.name, settings.BREAKER_FAILURES, settings.BREAKER_RESET)
+
+    @property
+    def host(self) -> str:
+        hosts = [h.strip() for h in settings.COSDATA_SHARD_HOSTS.split(",") if h.strip()] or [settings.COSDATA_HOST]
+        return hosts[self.index % len(hosts)]
+
+    @property
+    def collection_name(self) -> str:
+        return settings.COLLECTION_NAME if self.count == 1 else f"{settings.COLLECTION_NAME}_{self.index}"
+
+    @property
+    def client(self):
+        if self._client is None:
+            # Blocks on a connect already in progress on another thread rather
+            # than reporting "disconnected" while it runs
+            with self._connect_lock:
+                if self._client is None and time.monotonic() - self._last_attempt >= settings.COSDATA_RECONNECT_INTERVAL:
+                    self._connect()
+        return self._client
+
+    @property
+    def available(self) -> bool:
+        # False while disconnected, while the breaker is open, or since the
+        # last search hit a connection error / timeout
+        return self.client is not None and not self._search_failed and self.breaker.state != "open"
+
+    @property
+    def transport(self):
+        return self._transport if self.client else None
+
+    def _connect(self):
+        self._last_attempt = time.monotonic()
+        try:
+            Client = None
+            # 1) Prefer bundled SDK if present
+            sdk_path = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                "cosdata-sdk-python",
+                "src",
+            )
+            if os.path.isdir(sdk_path):
+                if sdk_path not in sys.path:
+                    sys.path.insert(0, sdk_path)
+                try:
+                    from cosdata import Client as _Client
+                    Client = _Client
+                except Exception:
+                    Client = None
+
+            # 2) Try installed cosdata_client
+            if Client is None:
+                try:
+                    from cosdata_client import Client as _Client
+                    Client = _Client
+                except Exception:
+                    Client = None
+
+            # 3) Try installed cosdata
+            if Client is None:
+                try:
+                    from cosdata import Client as _Client
+                    Client = _Client
+                except Exception:
+                    Client = None
+
+            if Client is None:
+                raise ImportError("Unable to locate Cosdata Client class from any known package")
+            with metrics.span("db.connect"):
+                client = Client(
+                    host=self.host,
                     username=settings.COSDATA_USER,
                     password=settings.COSDATA_PASS,
                     verify=False
                 )
-            except Exception as e:
-                print(f"Warning: DB Connection failed on init: {e}")
-                cls._instance.client = None
-        return cls._instance
+            self._transport = CosdataTransport(client)
+            self._client = client
+            self._connected_at = time.time()
+        except Exception as e:
+            print(f"Warning: DB Connection failed ({self.name}): {e}")
+            self._client = None
+            self._transport = None
+
+    def invalidate_collection(self):
+        self._collection = None
+        self._collection_checked_at = 0.0
+
+    def _collection_alive(self) -> bool:
+        try:
+            resp = self.transport.get(f"collections/{self.collection_name}")
+            return resp.status_code == 200
+        except Exception:
+            return False
 
     def get_collection(self, reset: bool = False):
         if not self.client:
-             raise Exception("Database Client not initialized. Check server status.")
+             raise Exception(f"Database Client not initialized ({self.name}). Check server status.")
+
+        with self._collection_lock:
+            if not reset and self._collection is not None:
+                # Reuse the handle; only re-validate it once it has gone stale
+                if time.monotonic() - self._collection_checked_at < settings.COLLECTION_HANDLE_TTL:
+                    return self._collection
+                if self._collection_alive():
+                    self._collection_checked_at = time.monotonic()
+                    return self._collection
+            self.invalidate_collection()
+            col = self._open_collection(reset=reset)
+            self._collection = col
+            self._collection_checked_at = time.monotonic()
+            return col
 
+    def _open_collection(self, reset: bool = False):
+        name = self.collection_name
         if reset:
             try:
-                self.client.get_collection(settings.COLLECTION_NAME).delete()
-                print(f"🧹 Collection '{settings.COLLECTION_NAME}' deleted.")
+                self.client.get_collection(name).delete()
+                print(f"🧹 Collection '{name}' deleted.")
                 time.sleep(1)
             except Exception:
                 pass
 
         try:
             if not reset:
-                return self.client.get_collection(settings.COLLECTION_NAME)
+                return self.client.get_collection(name)
             raise Exception("Force create")
         except:
-            print(f"🚀 Creating collection '{settings.COLLECTION_NAME}'...")
+            print(f"🚀 Creating collection '{name}'...")
             col = self.client.create_collection(
-                name=settings.COLLECTION_NAME,
+                name=name,
                 dimension=384,
                 tf_idf_options={"enabled": True}
             )
@@ -83,30 +200,387 @@ class CosdataManager:
             col.create_tf_idf_index(name="sparse_idx", k1=1.5, b=0.75)
             return col
 
-    def manual_hybrid_search(self, dense_vec: list, text_query: str, top_k: int = 10, fusion_k: float = 60.0):
-        if not self.client: return []
-        
-        url = f"{self.client.base_url}/collections/{settings.COLLECTION_NAME}/search/hybrid"
-        headers = self.client._get_headers()
-        
+    def search(self, kind: str, payload: Dict, share: float = 1.0) -> List[Dict] | None:
+        # One search call under the caller's deadline (`share` of what is
+        # left), hedged after the recent latency percentile for this kind and
+        # gated by the circuit breaker. Returns None on failure.
+        if not self.client:
+            return None
+        deadline = current_deadline()
+        if deadline is not None and deadline.expired():
+            metrics.incr("search.deadline_exceeded", stage=kind)
+            deadline.missed = True
+            return None
+        if not self.breaker.allow():
+            # Unhealthy server: fail fast, callers serve cached / degraded results
+            self._search_failed = True
+            return None
+
+        timeout = deadline.budget(share) if deadline is not None else None
+        read_timeout = min(settings.COSDATA_READ_TIMEOUT, timeout) if timeout else settings.COSDATA_READ_TIMEOUT
+        transport = self.transport
+        timer = f"db.{kind}_request"
+
+        def call():
+            start = time.perf_counter()
+            resp = transport.post(
+                f"collections/{self.collection_name}/search/{kind}",
+                json=payload,
+                timeout=(settings.COSDATA_CONNECT_TIMEOUT, read_timeout),
+            )
+            if resp.status_code < 500:
+                metrics.observe(timer, time.perf_counter() - start)
+            return resp
+
+        hedge_after = None
+        if settings.HEDGE_PERCENTILE > 0:
+            observed = metrics.percentile(timer, settings.HEDGE_PERCENTILE, settings.HEDGE_MIN_SAMPLES)
+            if observed is not None:
+                hedge_after = max(settings.HEDGE_MIN_DELAY, observed)
+
+        try:
+            resp = hedged_call(self._search_pool, call, hedge_after, timeout, hedges=1 if hedge_after is not None else 0)
+            if resp.status_code >= 500:
+                raise ConnectionError(f"server error {resp.status_code}")
+            self._search_failed = False
+            self.breaker.record_success()
+            if resp.status_code == 200:
+                body = resp.json()
+                return body.get("results", []) if isinstance(body, dict) else body
+            print(f"❌ Search Error ({resp.status_code}): {resp.text}")
+            metrics.incr("errors", stage=kind, status=resp.status_code)
+            return None
+        except TimeoutError:
+            metrics.incr("search.deadline_exceeded", stage=kind)
+            if deadline is not None:
+                deadline.missed = True
+            self._mark_failed()
+            return None
+        except Exception as e:
+            print(f"🚨 Connection Error ({self.name}): {e}")
+            metrics.incr("errors", stage=kind, status="connection")
+            self._mark_failed()
+            return None
+
+    def _mark_failed(self):
+        self._search_failed = True
+        self.breaker.record_failure()
+        # Force a health check before the cached handle is trusted again
+        self._collection_checked_at = 0.0
+
+
+class ShardedTransaction:
+    # Context manager standing in for `col.transaction()` across shards: each
+    # vector goes to the shard its id hashes to, and every shard that received
+    # vectors commits (or aborts) its own transaction on exit. Shards commit
+    # independently, so a failure part-way through can leave earlier shards
+    # committed; re-running the ingest is idempotent (ids are content hashes).
+    def __init__(self, manager: "CosdataManager", collections: List):
+        self.manager = manager
+        self.collections = collections
+        self._open: Dict[int, tuple] = {}
+
+    def __enter__(self):
+        return self
+
+    def _txn(self, index: int):
+        if index not in self._open:
+            ctx = self.collections[index].transaction()
+            self._open[index] = (ctx, ctx.__enter__())
+        return self._open[index][1]
+
+    def batch_upsert_vectors(self, vectors: List[Dict]):
+        groups: Dict[int, List[Dict]] = {}
+        for v in vectors:
+            groups.setdefault(self.manager.shard_for(v["id"]).index, []).append(v)
+        txns = {index: self._txn(index) for index in groups}
+        futures = [self.manager._scatter_pool.submit(txns[index].batch_upsert_vectors, vecs) for index, vecs in groups.items()]
+        for future in futures:
+            future.result()
+
+    def poll_completion(self, target_status: str = "complete", max_attempts: int = 10, **kwargs):
+        results = [txn.poll_completion(target_status=target_status, max_attempts=max_attempts, **kwargs) for _, txn in self._open.values()]
+        ok = all(r[1] for r in results if isinstance(r, tuple))
+        return (target_status if ok else "pending", ok)
+
+    def __exit__(self, exc_type, exc, tb):
+        error = None
+        for ctx, _ in self._open.values():
+            try:
+                ctx.__exit__(exc_type, exc, tb)
+            except Exception as e:
+                if exc is None and error is None:
+                    error = e
+        if error is not None:
+            raise error
+        return False
+
+
+class ShardedCollection:
+    # What get_collection() returns when COSDATA_SHARDS > 1. Only the write
+    # path goes through it; searches and fetches are routed by CosdataManager.
+    def __init__(self, manager: "CosdataManager", collections: List):
+        self.manager = manager
+        self.collections = collections
+        self.name = settings.COLLECTION_NAME
+
+    def transaction(self):
+        return ShardedTransaction(self.manager, self.collections)
+
+
+def _hit_id(r: Dict):
+    for k in ("vector", "item", "data"):
+        if isinstance(r.get(k), dict):
+            return r.get("id") or r[k].get("id")
+    return r.get("id")
+
+
+def _hit_score(r: Dict) -> float:
+    container = next((r[k] for k in ("vector", "item", "data") if isinstance(r.get(k), dict)), r)
+    return float(r.get("score") or container.get("score") or r.get("similarity") or 0.0)
+
+
+class CosdataManager:
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(CosdataManager, cls).__new__(cls)
+            cls._instance._fetch_pool = ThreadPoolExecutor(
+                max_workers=settings.FETCH_CONCURRENCY, thread_name_prefix="cosdata-fetch"
+            )
+            # Search requests (and their hedges) run here so the caller can stop waiting at its deadline
+            cls._instance._search_pool = ThreadPoolExecutor(
+                max_workers=settings.COSDATA_POOL_SIZE, thread_name_prefix="cosdata-search"
+            )
+            count = max(1, settings.COSDATA_SHARDS)
+            cls._instance.shards = [CosdataShard(i, count, cls._instance._search_pool) for i in range(count)]
+            # Fan-out to shards (one task per shard and leg per search / upsert)
+            cls._instance._scatter_pool = ThreadPoolExecutor(
+                max_workers=max(1, 4 * count), thread_name_prefix="cosdata-scatter"
+            )
+        return cls._instance
+
+    @property
+    def available(self) -> bool:
+        # Any shard that can still answer is enough; the rest show up as partial results
+        return any(shard.available for shard in self.shards)
+
+    def breaker_states(self) -> Dict[str, str]:
+        return {shard.name: shard.breaker.state for shard in self.shards}
+
+    def vector_count(self) -> int | None:
+        # Vectors stored across all shards, or None if any shard can't say
+        total = 0
+        for shard in self.shards:
+            try:
+                resp = shard.transport.get(f"collections/{shard.collection_name}")
+                info = resp.json() if resp.status_code == 200 else {}
+            except Exception:
+                return None
+            count = info.get("vector_count", info.get("num_vectors")) if isinstance(info, dict) else None
+            if count is None:
+                return None
+            total += int(count)
+        return total
+
+    def shard_for(self, vid: str) -> CosdataShard:
+        # Stable across processes and restarts (unlike hash()), so ingest,
+        # fetches and later re-ingests agree on where a document lives
+        if len(self.shards) == 1:
+            return self.shards[0]
+        digest = hashlib.blake2b(str(vid).encode("utf-8"), digest_size=8).digest()
+        return self.shards[int.from_bytes(digest, "big") % len(self.shards)]
+
+    def warm_up(self, background: bool = True):
+        # Connect and cache the collection handle ahead of the first search
+        def run():
+            try:
+                self.get_collection()
+            except Exception as e:
+                print(f"Warning: DB warm-up failed: {e}")
+
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name="cosdata-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def invalidate_collection(self):
+        for shard in self.shards:
+            shard.invalidate_collection()
+
+    def get_collection(self, reset: bool = False):
+        # Ingest needs every shard, so any unreachable shard raises here
+        down = [shard.name for shard in self.shards if not shard.client]
+        if down:
+            raise Exception(f"Database Client not initialized ({', '.join(down)}). Check server status.")
+        if reset:
+            doc_store.clear()
+            analytics.clear()
+            mirror = get_mirror()
+            if mirror is not None:
+                mirror.clear()
+        if len(self.shards) == 1:
+            return self.shards[0].get_collection(reset=reset)
+        return ShardedCollection(self, [shard.get_collection(reset=reset) for shard in self.shards])
+
+    def manual_hybrid_search(self, dense_vec: list, text_query: str, top_k: int = 10, fusion_k: float = 60.0, metadata_filter: dict | None = None, raw_text: bool = True):
+        dense_query = {"vector": dense_vec}
+        if metadata_filter:
+            dense_query["filter"] = metadata_filter
         payload = {
             "queries": [
-                {"dense": {"vector": dense_vec}},
+                {"dense": dense_query},
                 {"tf-idf": {"query": text_query}}
             ],
             "fusion_constant_k": float(fusion_k),
             "top_k": top_k,
-            "return_raw_text": True
+            "return_raw_text": raw_text
         }
-        
-        try:
-            resp = requests.post(url, headers=headers, json=payload, verify=False)
-            if resp.status_code == 200:
-                return resp.json().get("results", [])
-            print(f"❌ Search Error ({resp.status_code}): {resp.text}")
+        if len(self.shards) > 1:
+            return self._sharded_hybrid(dense_vec, text_query, top_k, fusion_k, metadata_filter, raw_text)
+        return self._scatter("hybrid", payload, settings.SEARCH_HYBRID_SHARE) or []
+
+    def _sharded_hybrid(self, dense_vec: list, text_query: str, top_k: int, fusion_k: float, metadata_filter: dict | None, raw_text: bool = True) -> List[Dict]:
+        # Per-shard RRF ranks are not comparable across shards (rank 5 of a
+        # third of the corpus is not rank 5 overall), so both legs are
+        # gathered from every shard, merged on their raw scores, and fused
+        # once over the global ranking
+        dense_payload = {"query_vector": dense_vec, "top_k": top_k, "return_raw_text": raw_text}
+        if metadata_filter:
+            dense_payload["filter"] = metadata_filter
+        sparse_payload = {"query": text_query, "top_k": top_k, "return_raw_text": raw_text}
+        share = settings.SEARCH_HYBRID_SHARE
+        dense = self._submit("dense", dense_payload, share)
+        sparse = self._submit("tf-idf", sparse_payload, share)
+        legs = {"dense": self._gather("dense", dense, top_k), "sparse": self._gather("tf-idf", sparse, top_k)}
+        partial = any(hits is None or (hits and hits[0].get("partial")) for hits in legs.values())
+        legs = {name: [{**hit, "id": _hit_id(hit), "score": _hit_score(hit)} for hit in hits] for name, hits in legs.items() if hits is not None}
+        if not legs:
             return []
+        results = fuse(legs, "rrf", k=fusion_k, top_k=top_k)
+        if partial:
+            for r in results:
+                r["partial"] = True
+        return results
+
+    def dense_search(self, dense_vec: list, top_k: int = 10, metadata_filter: dict | None = None, raw_text: bool = True) -> List[Dict] | None:
+        # Dense leg on its own (client-side fusion); None if the request failed
+        payload = {"query_vector": dense_vec, "top_k": top_k, "return_raw_text": raw_text}
+        if metadata_filter:
+            payload["filter"] = metadata_filter
+        return self._scatter("dense", payload, settings.SEARCH_HYBRID_SHARE)
+
+    def text_search(self, text_query: str, top_k: int = 10, share: float = 1.0, raw_text: bool = True) -> List[Dict] | None:
+        # TF-IDF leg / sparse-only fallback; None if the request failed
+        payload = {"query": text_query, "top_k": top_k, "return_raw_text": raw_text}
+        return self._scatter("tf-idf", payload, share)
+
+    def _scatter(self, kind: str, payload: Dict, share: float = 1.0) -> List[Dict] | None:
+        if len(self.shards) == 1:
+            return self.shards[0].search(kind, payload, share)
+        return self._gather(kind, self._submit(kind, payload, share), payload["top_k"])
+
+    def _submit(self, kind: str, payload: Dict, share: float) -> List:
+        return [self._scatter_pool.submit(bind_deadline(shard.search), kind, payload, share) for shard in self.shards]
+
+    def _gather(self, kind: str, futures: List, top_k: int) -> List[Dict] | None:
+        # Every shard was asked for the full top_k (any global top-k hit is in
+        # its own shard's top-k); the sorted lists are heap-merged by score.
+        # Cosine scores are global, and TF-IDF differs only by per-shard IDF,
+        # which hash-balanced shards keep close. None only if every shard
+        # failed; a gather missing shards is flagged "partial" so it is not
+        # cached.
+        lists = [f.result() for f in futures]
+        ok = [hits for hits in lists if hits is not None]
+        if not ok:
+            return None
+        merged = []
+        seen = set()
+        ranked = [sorted(hits, key=_hit_score, reverse=True) for hits in ok]
+        for hit in heapq.merge(*ranked, key=_hit_score, reverse=True):
+            rid = _hit_id(hit)
+            if rid is not None and rid in seen:
+                continue
+            seen.add(rid)
+            merged.append(hit)
+            if len(merged) >= top_k:
+                break
+        failed = len(lists) - len(ok)
+        if failed:
+            metrics.incr("search.shard_failed", failed, stage=kind)
+            merged = [{**hit, "partial": True} for hit in merged]
+        return merged
+
+    def existing_ids(self, ids: List[str]) -> set | None:
+        # Which of `ids` the collection holds: one HEAD per id on its shard,
+        # concurrently over the pooled sessions. None if a needed shard can't
+        # be asked (disconnected, breaker open, or an unexpected response).
+        ids = list(dict.fromkeys(i for i in ids if i))
+        if any(not self.shard_for(vid).client or self.shard_for(vid).breaker.state == "open" for vid in ids):
+            return None
+
+        def exists(vid):
+            shard = self.shard_for(vid)
+            resp = shard.transport.request("HEAD", f"collections/{shard.collection_name}/vectors/{vid}")
+            if resp.status_code not in (200, 404):
+                raise ConnectionError(f"unexpected status {resp.status_code}")
+            return resp.status_code == 200
+
+        try:
+            found = list(self._fetch_pool.map(exists, ids))
         except Exception as e:
-            print(f"🚨 Connection Error: {e}")
-            return []
+            print(f"Warning: could not verify indexed documents: {e}")
+            return None
+        return {vid for vid, ok in zip(ids, found) if ok}
+
+    def fetch_documents(self, ids: List[str]) -> Dict[str, Dict]:
+        # Local store first; whatever is missing is fetched concurrently (bounded
+        # by FETCH_CONCURRENCY) from the shard that owns it and remembered.
+        found = doc_store.get_many(ids)
+        missing = [i for i in dict.fromkeys(ids) if i and i not in found]
+        if not missing:
+            return found
+        cols = {}
+        for vid in missing:
+            shard = self.shard_for(vid)
+            if shard.index in cols or not shard.client or shard.breaker.state == "open":
+                continue
+            try:
+                cols[shard.index] = shard.get_collection()
+            except Exception:
+                pass
+        missing = [vid for vid in missing if self.shard_for(vid).index in cols]
+        if not missing:
+            return found
+
+        def fetch_one(vid):
+            try:
+                vec = cols[self.shard_for(vid).index].vectors.get(vid)
+            except Exception:
+                return None
+            text = getattr(vec, "text", None)
+            if isinstance(vec, dict):
+                text = vec.get("text") or vec.get("raw_text")
+            if not text:
+                return None
+            meta = getattr(vec, "metadata", None) or (vec.get("metadata") if isinstance(vec, dict) else None) or {}
+            return {"id": vid, "text": text, "metadata": meta}
+
+        metrics.incr("backfill.remote_fetches", len(missing))
+        deadline = current_deadline()
+        futures = [self._fetch_pool.submit(fetch_one, vid) for vid in missing]
+        done, late = wait(futures, timeout=deadline.remaining() if deadline is not None else None)
+        for future in late:
+            future.cancel()
+        if late:
+            metrics.incr("search.deadline_exceeded", stage="backfill")
+            deadline.missed = True
+        fetched = [doc for doc in (f.result() for f in done) if doc]
+        doc_store.put_many(fetched)
+        found.update({doc["id"]: doc for doc in fetched})
+        return found
 
 db = CosdataManager()
\ No newline at end of file
@@ -0,0 +1,78 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, Iterator, List
+from ..config import settings
+
+class DocStore:
+    # Local id -> (text, metadata) store, filled at ingest and on first fetch,
+    # so result backfill rarely needs a round trip to Cosdata.
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS docs (id TEXT PRIMARY KEY, text TEXT, metadata TEXT)"
+            )
+            self._conn.commit()
+
+    def put_many(self, items: Iterable[Dict]):
+        rows = [
+            (item["id"], item.get("text") or "", json.dumps(item.get("metadata") or {}))
+            for item in items
+            if item.get("id")
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO docs (id, text, metadata) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET text = excluded.text, metadata = excluded.metadata",
+                rows,
+            )
+            self._conn.commit()
+
+    def get_many(self, ids: List[str]) -> Dict[str, Dict]:
+        found = {}
+        ids = list(dict.fromkeys(i for i in ids if i))
+        # Stay well under SQLite's bound-parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT id, text, metadata FROM docs WHERE id IN ({marks})", chunk
+                ).fetchall()
+            for rid, text, meta in rows:
+                found[rid] = {"id": rid, "text": text, "metadata": json.loads(meta or "{}")}
+        return found
+
+    def iter_all(self, chunk: int = 1000) -> Iterator[Dict]:
+        # Keyset pagination so a full pass never holds more than one chunk
+        last = ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, text, metadata FROM docs WHERE id > ? ORDER BY id LIMIT ?", (last, chunk)
+                ).fetchall()
+            if not rows:
+                return
+            for rid, text, meta in rows:
+                yield {"id": rid, "text": text, "metadata": json.loads(meta or "{}")}
+            last = rows[-1][0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM docs")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+doc_store = DocStore(settings.DOC_STORE_PATH)
@@ -0,0 +1,60 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+from ..config import settings
+
+class EmbeddingCache:
+    # Persistent (content hash, model) -> float32 vector store. Survives
+    # collection resets, so re-uploaded resumes never hit the model twice.
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "hash TEXT NOT NULL, model TEXT NOT NULL, vector BLOB NOT NULL, "
+                "PRIMARY KEY (hash, model))"
+            )
+            self._conn.commit()
+
+    def get_many(self, hashes: List[str], model: str) -> Dict[str, List[float]]:
+        found = {}
+        hashes = list(dict.fromkeys(h for h in hashes if h))
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({marks})",
+                    [model, *chunk],
+                ).fetchall()
+            for h, blob in rows:
+                found[h] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, List[float]]], model: str):
+        rows = [(h, model, np.asarray(vec, dtype=np.float32).tobytes()) for h, vec in items]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (hash, model, vector) VALUES (?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+embedding_cache = EmbeddingCache(settings.EMBEDDING_CACHE_PATH)
@@ -0,0 +1,137 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List
+from ..config import settings
+
+# Counters a job reports per pipeline stage
+COUNTERS = ("parsed", "embedded", "indexed", "skipped", "failed")
+FINISHED = ("completed", "failed", "cancelled", "interrupted")
+
+def _boot_id() -> str:
+    try:
+        with open("/proc/sys/kernel/random/boot_id") as f:
+            return f.read().strip()
+    except OSError:
+        return socket.gethostname()
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobStore:
+    # Persistent status for background jobs. Rows are updated as stages make
+    # progress so any session (or process) can poll them. Each job records
+    # the process that runs it; when the store is opened, jobs still marked
+    # running whose process is gone (or predates a reboot) are interrupted.
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, total INTEGER NOT NULL, "
+                "parsed INTEGER NOT NULL DEFAULT 0, embedded INTEGER NOT NULL DEFAULT 0, "
+                "indexed INTEGER NOT NULL DEFAULT 0, skipped INTEGER NOT NULL DEFAULT 0, "
+                "failed INTEGER NOT NULL DEFAULT 0, errors TEXT NOT NULL DEFAULT '[]', "
+                "message TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL, finished_at REAL, owner TEXT)"
+            )
+            if "owner" not in [c[1] for c in self._conn.execute("PRAGMA table_info(jobs)")]:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            self._owner = f"{_boot_id()}:{os.getpid()}"
+            # The UI and API open this file too: only jobs whose owner has
+            # died are interrupted, not ones another live process is running
+            now = time.time()
+            for job_id, owner in self._conn.execute("SELECT id, owner FROM jobs WHERE status IN ('queued', 'running')").fetchall():
+                if not self._owner_alive(owner):
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'interrupted', finished_at = ?, updated_at = ? WHERE id = ?",
+                        (now, now, job_id),
+                    )
+            self._conn.commit()
+
+    def _owner_alive(self, owner: str | None) -> bool:
+        boot, _, pid = (owner or "").rpartition(":")
+        if boot != self._owner.rpartition(":")[0] or not pid.isdigit():
+            return False
+        return _alive(int(pid))
+
+    def create(self, kind: str, total: int) -> str:
+        job_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, status, total, created_at, updated_at, owner) VALUES (?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, kind, total, now, now, self._owner),
+            )
+            self._conn.commit()
+        return job_id
+
+    def advance(self, job_id: str, **deltas):
+        # Adds to the stage counters, e.g. advance(job_id, embedded=32)
+        sets = [f"{name} = {name} + ?" for name in COUNTERS if deltas.get(name)]
+        if not sets:
+            return
+        args = [deltas[name] for name in COUNTERS if deltas.get(name)]
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET {', '.join(sets)}, updated_at = ? WHERE id = ?", (*args, time.time(), job_id)
+            )
+            self._conn.commit()
+
+    def add_error(self, job_id: str, name: str, error: str):
+        # Per-item failures; the job keeps going. Only the first few are kept.
+        with self._lock:
+            row = self._conn.execute("SELECT errors FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            errors = json.loads(row[0])
+            if len(errors) < settings.INGEST_JOB_MAX_ERRORS:
+                errors.append({"name": name, "error": error})
+            self._conn.execute(
+                "UPDATE jobs SET errors = ?, failed = failed + 1, updated_at = ? WHERE id = ?",
+                (json.dumps(errors), time.time(), job_id),
+            )
+            self._conn.commit()
+
+    def set_status(self, job_id: str, status: str, message: str | None = None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, message = COALESCE(?, message), updated_at = ?, finished_at = ? WHERE id = ?",
+                (status, message, now, now if status in FINISHED else None, job_id),
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Dict | None:
+        with self._lock:
+            cur = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+            row = cur.fetchone()
+            cols = [c[0] for c in cur.description]
+        if row is None:
+            return None
+        job = dict(zip(cols, row))
+        job["errors"] = json.loads(job["errors"])
+        return job
+
+    def recent(self, limit: int = 10) -> List[Dict]:
+        with self._lock:
+            ids = [r[0] for r in self._conn.execute("SELECT id FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,))]
+        return [job for job in (self.get(i) for i in ids) if job]
+
+job_store = JobStore(settings.JOBS_PATH)
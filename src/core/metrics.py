@@ -0,0 +1,144 @@
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict, List
+
+# Process-wide stage timers and counters for the search and ingest pipelines.
+# Timers keep a bounded reservoir of recent samples for percentiles; a
+# thread-local trace collects the spans of the request currently running.
+
+
+def _label_key(labels: Dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Metrics:
+    def __init__(self, reservoir: int = 2048, keep_traces: int = 50):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(float)
+        self._timer_samples = defaultdict(lambda: deque(maxlen=reservoir))
+        self._timer_sum = defaultdict(float)
+        self._timer_count = defaultdict(int)
+        self._caches = {}
+        self._local = threading.local()
+        self.traces = deque(maxlen=keep_traces)
+
+    def incr(self, name: str, value: float = 1, **labels):
+        with self._lock:
+            self._counters[(name, _label_key(labels))] += value
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            self._timer_samples[name].append(seconds)
+            self._timer_sum[name] += seconds
+            self._timer_count[name] += 1
+        trace = getattr(self._local, "trace", None)
+        if trace is not None:
+            trace["spans"].append((name, round(seconds * 1000.0, 3)))
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    @contextmanager
+    def trace(self, name: str, **attrs):
+        # Collects every span observed on this thread until the block exits
+        outer = getattr(self._local, "trace", None)
+        trace = {"name": name, "started_at": time.time(), "spans": [], **attrs}
+        self._local.trace = trace
+        start = time.perf_counter()
+        try:
+            yield trace
+        finally:
+            trace["total_ms"] = round((time.perf_counter() - start) * 1000.0, 3)
+            self._local.trace = outer
+            self.traces.append(trace)
+
+    def percentile(self, name: str, p: float, min_samples: int = 1) -> float | None:
+        # Recent-sample percentile in seconds, or None until enough samples exist
+        with self._lock:
+            samples = self._timer_samples.get(name)
+            if not samples or len(samples) < min_samples:
+                return None
+            ordered = sorted(samples)
+        return _pct(ordered, p)
+
+    def register_cache(self, name: str, cache):
+        # Any object with `hits` / `misses` attributes (e.g. TTLCache)
+        self._caches[name] = cache
+
+    def last_trace(self, name: str | None = None) -> Dict | None:
+        for trace in reversed(self.traces):
+            if name is None or trace["name"] == name:
+                return trace
+        return None
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            counters = {
+                name + ("{" + ",".join(f"{k}={v}" for k, v in labels) + "}" if labels else ""): value
+                for (name, labels), value in sorted(self._counters.items())
+            }
+            timers = {}
+            for name, samples in sorted(self._timer_samples.items()):
+                ordered = sorted(samples)
+                timers[name] = {
+                    "count": self._timer_count[name],
+                    "sum_ms": round(self._timer_sum[name] * 1000.0, 3),
+                    **{f"p{p}_ms": round(_pct(ordered, p) * 1000.0, 3) for p in (50, 95, 99)},
+                }
+        caches = {}
+        for name, cache in self._caches.items():
+            total = cache.hits + cache.misses
+            caches[name] = {"hits": cache.hits, "misses": cache.misses, "hit_rate": round(cache.hits / total, 4) if total else None}
+        return {"counters": counters, "timers": timers, "caches": caches}
+
+    def render_prometheus(self, prefix: str = "kosdra") -> str:
+        lines: List[str] = []
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                lines.append(f"{prefix}_{_metric_name(name)}_total{_prom_labels(labels)} {value}")
+            for name, samples in sorted(self._timer_samples.items()):
+                metric = f"{prefix}_{_metric_name(name)}_seconds"
+                ordered = sorted(samples)
+                for q in (0.5, 0.95, 0.99):
+                    lines.append(f'{metric}{{quantile="{q}"}} {_pct(ordered, q * 100):.6f}')
+                lines.append(f"{metric}_sum {self._timer_sum[name]:.6f}")
+                lines.append(f"{metric}_count {self._timer_count[name]}")
+        for name, cache in self._caches.items():
+            lines.append(f'{prefix}_cache_hits_total{{cache="{name}"}} {cache.hits}')
+            lines.append(f'{prefix}_cache_misses_total{{cache="{name}"}} {cache.misses}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timer_samples.clear()
+            self._timer_sum.clear()
+            self._timer_count.clear()
+        self.traces.clear()
+
+
+def _pct(ordered: List[float], p: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))]
+
+
+def _metric_name(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _prom_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+metrics = Metrics()
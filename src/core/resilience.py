@@ -0,0 +1,159 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from typing import Callable
+from .metrics import metrics
+
+# Tail-latency controls for calls to Cosdata: a per-request deadline carried on
+# the calling thread, hedged duplicate requests and a circuit breaker.
+
+
+class Deadline:
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        # Set by any stage that gave up on a call because the budget ran out
+        self.missed = False
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def budget(self, share: float = 1.0) -> float:
+        # Slice of what is left for one stage, so later stages still get time
+        return self.remaining() * min(max(share, 0.0), 1.0)
+
+
+_local = threading.local()
+
+
+@contextmanager
+def deadline_scope(seconds: float | None):
+    # Everything on this thread inside the block shares one deadline; a
+    # nested scope never extends an outer one. None/0 means no deadline.
+    outer = getattr(_local, "deadline", None)
+    deadline = Deadline(seconds) if seconds else None
+    if outer is not None and (deadline is None or outer.expires_at < deadline.expires_at):
+        deadline = outer
+    _local.deadline = deadline
+    try:
+        yield deadline
+    finally:
+        _local.deadline = outer
+
+
+def current_deadline() -> Deadline | None:
+    return getattr(_local, "deadline", None)
+
+
+def bind_deadline(fn: Callable) -> Callable:
+    # Runs fn under the calling thread's deadline when it is handed to a pool
+    deadline = current_deadline()
+
+    def run(*args, **kwargs):
+        outer = getattr(_local, "deadline", None)
+        _local.deadline = deadline
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _local.deadline = outer
+
+    return run
+
+
+class CircuitBreaker:
+    # closed -> open after `failures` consecutive failures; after `reset`
+    # seconds one probe is let through (half-open) and its outcome decides.
+    def __init__(self, name: str, failures: int = 5, reset: float = 15.0):
+        self.name = name
+        self.failures = failures
+        self.reset = reset
+        self._lock = threading.Lock()
+        self._consecutive = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state_locked()
+
+    def _state_locked(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        if self.failures <= 0:
+            return True
+        with self._lock:
+            state = self._state_locked()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+        metrics.incr("breaker.rejected", breaker=self.name)
+        return False
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                metrics.incr("breaker.closed", breaker=self.name)
+            self._consecutive = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive += 1
+            if self._probing or (self._opened_at is None and self.failures > 0 and self._consecutive >= self.failures):
+                self._opened_at = time.monotonic()
+                metrics.incr("breaker.opened", breaker=self.name)
+            self._probing = False
+
+
+def hedged_call(pool, fn: Callable, hedge_after: float | None = None, timeout: float | None = None, hedges: int = 1):
+    # Runs fn() on `pool`; if it hasn't returned after `hedge_after` seconds
+    # (or fails), up to `hedges` duplicates are started and the first success
+    # wins. Only for idempotent reads. Raises TimeoutError past `timeout`.
+    start = time.monotonic()
+    end = start + timeout if timeout else None
+    first = pool.submit(fn)
+    pending = {first}
+    launched = 1
+    error = None
+    try:
+        while True:
+            next_hedge = None
+            if hedge_after is not None and launched <= hedges:
+                next_hedge = start + hedge_after * launched
+            marks = [t for t in (next_hedge, end) if t is not None]
+            done, _ = wait(pending, timeout=max(0.0, min(marks) - time.monotonic()) if marks else None, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.discard(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                if launched > 1:
+                    metrics.incr("hedge.completed", winner="first" if future is first else "hedge")
+                return result
+            now = time.monotonic()
+            if end is not None and now >= end:
+                raise TimeoutError(f"deadline exceeded after {now - start:.3f}s")
+            if launched <= hedges and (not pending or (next_hedge is not None and now >= next_hedge)):
+                pending.add(pool.submit(fn))
+                launched += 1
+                metrics.incr("hedge.sent")
+            elif not pending:
+                raise error
+    finally:
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,188 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+from ..config import settings
+
+class VectorMirror:
+    # Local copy of every dense vector, kept in sync at ingest. Vectors live in
+    # a memory-mapped matrix (int8 or float32, rows unit-normalized) and the
+    # id <-> row index in SQLite, so opening is O(1) and scans touch the page
+    # cache rather than the heap. Used to re-score hybrid candidates with exact
+    # cosine and as a read-only brute-force search while Cosdata is down.
+    def __init__(self, path: str, dim: int = 384, dtype: str = "int8"):
+        self.path = path
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.dtype("int8"), np.dtype("float32")):
+            raise ValueError(f"Unsupported VECTOR_MIRROR_DTYPE '{dtype}' (expected 'int8' or 'float32')")
+        os.makedirs(path, exist_ok=True)
+        self._matrix_path = os.path.join(path, f"vectors.{self.dtype.name}")
+        self._norms_path = os.path.join(path, f"norms.{self.dtype.name}")
+        self._conn = sqlite3.connect(os.path.join(path, "index.sqlite3"), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS rows (id TEXT PRIMARY KEY, row INTEGER UNIQUE NOT NULL)")
+            self._conn.commit()
+            self.count = self._max_row_locked()
+        self._mm = None
+        self._norms = None
+        self._open(max(self.count, 1024))
+
+    @staticmethod
+    def _grow(path: str, size: int) -> int:
+        # Extend the backing file (sparse on most filesystems); returns its size
+        with open(path, "r+b" if os.path.exists(path) else "w+b") as f:
+            if os.fstat(f.fileno()).st_size < size:
+                f.truncate(size)
+            return os.fstat(f.fileno()).st_size
+
+    def _open(self, capacity: int):
+        row_bytes = self.dim * self.dtype.itemsize
+        capacity = self._grow(self._matrix_path, capacity * row_bytes) // row_bytes
+        self._grow(self._norms_path, capacity * 4)
+        self._mm = np.memmap(self._matrix_path, dtype=self.dtype, mode="r+", shape=(capacity, self.dim))
+        # Stored row norms: int8 rows are only approximately unit length
+        self._norms = np.memmap(self._norms_path, dtype=np.float32, mode="r+", shape=(capacity,))
+
+    def _encode(self, vecs: np.ndarray) -> np.ndarray:
+        vecs = vecs / np.clip(np.linalg.norm(vecs, axis=1, keepdims=True), 1e-12, None)
+        if self.dtype == np.int8:
+            return np.clip(np.rint(vecs * 127.0), -127, 127).astype(np.int8)
+        return vecs.astype(np.float32)
+
+    def _scores(self, block: np.ndarray, norms: np.ndarray, q: np.ndarray) -> np.ndarray:
+        return (block.astype(np.float32) @ q) / np.clip(norms, 1e-12, None)
+
+    def put_many(self, items: Iterable[Dict]):
+        items = [it for it in items if it.get("id") and it.get("dense_values") is not None]
+        items = [it for it in items if len(it["dense_values"]) == self.dim]
+        if not items:
+            return
+        vecs = self._encode(np.asarray([it["dense_values"] for it in items], dtype=np.float32))
+        with self._lock:
+            # Rows are allocated under SQLite's write lock from the committed
+            # maximum, not a per-process counter: the bulk CLI, the UI and the
+            # API may all be appending to the same mirror.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._rows_locked([it["id"] for it in items])
+                count = self._max_row_locked()
+                new = []
+                for it in items:
+                    if it["id"] not in rows:
+                        rows[it["id"]] = count
+                        new.append((it["id"], count))
+                        count += 1
+                if count > self._mm.shape[0]:
+                    self._mm.flush()
+                    self._norms.flush()
+                    self._open(max(count, self._mm.shape[0] * 2))
+                targets = [rows[it["id"]] for it in items]
+                self._mm[targets] = vecs
+                self._norms[targets] = np.linalg.norm(vecs.astype(np.float32), axis=1)
+                self._mm.flush()
+                self._norms.flush()
+                self._conn.executemany("INSERT INTO rows (id, row) VALUES (?, ?)", new)
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self.count = count
+
+    def _max_row_locked(self) -> int:
+        return self._conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM rows").fetchone()[0]
+
+    def _refresh_locked(self):
+        # Pick up rows appended by other processes; remap if the file grew
+        self.count = self._max_row_locked()
+        if self.count > self._mm.shape[0]:
+            self._open(self.count)
+
+    def _rows_locked(self, ids: List[str]) -> Dict[str, int]:
+        found = {}
+        ids = list(dict.fromkeys(ids))
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            found.update(self._conn.execute(f"SELECT id, row FROM rows WHERE id IN ({marks})", chunk).fetchall())
+        return found
+
+    def _ids_locked(self, rows: List[int]) -> Dict[int, str]:
+        found = {}
+        for start in range(0, len(rows), 500):
+            chunk = [int(r) for r in rows[start:start + 500]]
+            marks = ",".join("?" * len(chunk))
+            found.update((r, i) for i, r in self._conn.execute(f"SELECT id, row FROM rows WHERE row IN ({marks})", chunk).fetchall())
+        return found
+
+    def _query(self, vec) -> np.ndarray:
+        q = np.asarray(vec, dtype=np.float32).reshape(-1)
+        return q / max(float(np.linalg.norm(q)), 1e-12)
+
+    def rescore(self, vec, ids: List[str]) -> Dict[str, float]:
+        # Exact (float32) or near-exact (int8) cosine for a candidate list
+        with self._lock:
+            rows = self._rows_locked(ids)
+            if rows and max(rows.values()) >= self._mm.shape[0]:
+                self._refresh_locked()
+            mm, norms = self._mm, self._norms
+        if not rows:
+            return {}
+        order = list(rows)
+        targets = [rows[i] for i in order]
+        scores = self._scores(mm[targets], norms[targets], self._query(vec))
+        return dict(zip(order, scores.tolist()))
+
+    def search(self, vec, top_k: int = 10, block: int | None = None) -> List[Tuple[str, float]]:
+        # Blocked brute-force scan: memory stays at one block of decoded rows
+        # plus a running top-k, whatever the pool size.
+        with self._lock:
+            self._refresh_locked()
+            mm, norms, count = self._mm, self._norms, self.count
+        if not count or top_k <= 0:
+            return []
+        q = self._query(vec)
+        block = block or settings.VECTOR_MIRROR_BLOCK
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start in range(0, count, block):
+            stop = min(start + block, count)
+            scores = self._scores(mm[start:stop], norms[start:stop], q)
+            k = min(top_k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            best_rows = np.concatenate([best_rows, top + start])
+            best_scores = np.concatenate([best_scores, scores[top]])
+            if len(best_rows) > top_k:
+                keep = np.argpartition(-best_scores, top_k - 1)[:top_k]
+                best_rows, best_scores = best_rows[keep], best_scores[keep]
+        order = np.argsort(-best_scores)
+        with self._lock:
+            ids = self._ids_locked(best_rows[order].tolist())
+        return [(ids[r], float(s)) for r, s in zip(best_rows[order].tolist(), best_scores[order].tolist()) if r in ids]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM rows")
+            self._conn.commit()
+            self.count = 0
+
+    def __len__(self):
+        with self._lock:
+            return self._max_row_locked()
+
+_mirror = None
+_mirror_lock = threading.Lock()
+
+def get_mirror() -> VectorMirror | None:
+    # None unless VECTOR_MIRROR is enabled; opened lazily on first use
+    global _mirror
+    if not settings.VECTOR_MIRROR:
+        return None
+    if _mirror is None:
+        with _mirror_lock:
+            if _mirror is None:
+                _mirror = VectorMirror(settings.VECTOR_MIRROR_PATH, dtype=settings.VECTOR_MIRROR_DTYPE)
+    return _mirror
@@ -0,0 +1,292 @@
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List
+from ..config import settings
+from ..core.db_client import db
+from ..core.metrics import metrics
+from .ingest import content_id, embed_documents, index_documents, prepare_documents
+from .parser import extract_text_from_bytes
+
+# Offline loader for large resume archives. Workers parse, extract metadata
+# and embed whole tasks of files; the parent upserts the results in
+# transactions sized by payload bytes and only then checkpoints the files, so
+# an interrupted run resumes without redoing (or skipping) anything.
+
+EXTENSIONS = (".pdf", ".docx", ".txt")
+STAGES = ("parse", "embed", "upsert")
+
+
+class IngestCheckpoint:
+    # source key -> (signature, status). A file whose size/mtime changed since
+    # it was recorded is processed again.
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sources (key TEXT PRIMARY KEY, sig TEXT, id TEXT, status TEXT NOT NULL, error TEXT)"
+            )
+            self._conn.commit()
+
+    def done(self, sources: List[Dict], retry_failed: bool = False) -> set:
+        # Keys among `sources` that need no work this run
+        found = set()
+        for start in range(0, len(sources), 500):
+            chunk = sources[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT key, sig, status FROM sources WHERE key IN ({marks})", [s["key"] for s in chunk]
+                ).fetchall()
+            sigs = {s["key"]: s.get("sig") for s in chunk}
+            for key, sig, status in rows:
+                if sig == sigs.get(key) and not (retry_failed and status == "failed"):
+                    found.add(key)
+        return found
+
+    def mark(self, rows: List[tuple]):
+        # rows: (key, sig, id, status, error)
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sources (key, sig, id, status, error) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM sources GROUP BY status").fetchall())
+
+
+def _signature(path: str) -> str:
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def iter_directory(root: str) -> Iterator[Dict]:
+    # Deterministic walk, so progress lines are comparable between runs
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(EXTENSIONS):
+                path = os.path.abspath(os.path.join(dirpath, name))
+                yield {"key": path, "path": path, "sig": _signature(path)}
+
+
+def iter_manifest(path: str) -> Iterator[Dict]:
+    # JSONL of {"path" | "text", optional "id", "metadata"} (paths relative to
+    # the manifest), or any other file with one path per line
+    base = os.path.dirname(os.path.abspath(path))
+    jsonl = path.lower().endswith((".jsonl", ".ndjson"))
+    with open(path, encoding="utf-8") as f:
+        for n, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line) if jsonl else {"path": line}
+            src = {"id": entry.get("id"), "metadata": entry.get("metadata") or {}}
+            if entry.get("path"):
+                src["path"] = os.path.normpath(os.path.join(base, entry["path"]))
+                src["key"] = entry.get("id") or src["path"]
+                src["sig"] = _signature(src["path"]) if os.path.exists(src["path"]) else None
+            else:
+                src["text"] = entry.get("text") or ""
+                src["key"] = entry.get("id") or f"line:{n}"
+                src["sig"] = content_id(src["text"])
+            yield src
+
+
+def _read_source(src: Dict) -> str:
+    if "text" in src:
+        return src["text"]
+    size = os.path.getsize(src["path"])
+    if size > settings.PARSE_MAX_BYTES:
+        raise ValueError(f"file is {size} bytes (limit {settings.PARSE_MAX_BYTES})")
+    with open(src["path"], "rb") as f:
+        return extract_text_from_bytes(f.read(), os.path.basename(src["path"]))
+
+
+def process_task(sources: List[Dict]) -> Dict:
+    # Runs in a worker: parse -> metadata/dedupe -> embed for one task.
+    # Returns (key, item) pairs ready to upsert plus skips and failures.
+    out = {"items": [], "skipped": [], "failed": [], "parse_s": 0.0, "embed_s": 0.0, "parsed": 0, "embedded": 0}
+    docs = []
+    start = time.perf_counter()
+    for src in sources:
+        try:
+            text = _read_source(src)
+            if not text.strip():
+                raise ValueError("no text extracted")
+        except Exception as e:
+            out["failed"].append((src["key"], str(e)))
+            continue
+        name = os.path.basename(src["path"]) if src.get("path") else None
+        meta = {**({"name": name} if name else {}), **(src.get("metadata") or {})}
+        docs.append((src["key"], {"id": src.get("id") or content_id(text), "text": text, "metadata": meta}))
+    out["parsed"] = len(docs)
+    out["parse_s"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, pending, _ = prepare_documents([d for _, d in docs])
+    pending_ids = {item["id"] for item in pending}
+    keys = {}
+    for key, d in docs:
+        keys.setdefault(d["id"], []).append(key)
+        if d["id"] not in pending_ids:
+            out["skipped"].append((key, d["id"]))
+    if pending:
+        vecs = embed_documents([item["text"] for item in pending])
+        for item, vec in zip(pending, vecs):
+            out["items"].append((keys[item["id"]], {**item, "dense_values": vec}))
+    out["embedded"] = len(pending)
+    out["embed_s"] = time.perf_counter() - start
+    return out
+
+
+def _init_worker(threads: int):
+    # N workers x all cores would oversubscribe the CPU; split it instead
+    if not settings.EMBEDDING_THREADS:
+        settings.EMBEDDING_THREADS = threads
+
+
+class _Inline:
+    # ProcessPoolExecutor stand-in for --workers 1
+    def submit(self, fn, *args):
+        fut = Future()
+        try:
+            fut.set_result(fn(*args))
+        except Exception as e:
+            fut.set_exception(e)
+        return fut
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def _payload_bytes(item: Dict) -> int:
+    # Rough JSON size: text, ~10 bytes per float, metadata
+    return len(item.get("text") or "") + 10 * len(item.get("dense_values") or []) + len(json.dumps(item.get("metadata") or {}))
+
+
+def run_bulk_ingest(
+    sources: Iterable[Dict],
+    checkpoint: IngestCheckpoint,
+    workers: int | None = None,
+    task_size: int | None = None,
+    txn_bytes: int | None = None,
+    txn_docs: int | None = None,
+    retry_failed: bool = False,
+    col=None,
+    report: Callable[[Dict], None] | None = None,
+    report_every: float = 10.0,
+) -> Dict:
+    workers = workers or settings.BULK_WORKERS or os.cpu_count() or 1
+    task_size = task_size or settings.BULK_TASK_SIZE
+    txn_bytes = txn_bytes or settings.BULK_TXN_BYTES
+    txn_docs = txn_docs or settings.BULK_TXN_MAX_DOCS
+    col = col if col is not None else db.get_collection()
+
+    stats = {"seen": 0, "resumed": 0, "indexed": 0, "skipped": 0, "failed": 0, "parsed": 0, "embedded": 0, "transactions": 0}
+    busy = {stage: 0.0 for stage in STAGES}
+    started = time.perf_counter()
+    last_report = started
+    buf, buf_keys, buf_bytes = [], [], 0
+    txn = None
+
+    def snapshot() -> Dict:
+        wall = max(time.perf_counter() - started, 1e-9)
+        # Pool stages report aggregate throughput across the workers
+        share = {"parse": workers, "embed": workers, "upsert": 1}
+        done = {"parse": stats["parsed"], "embed": stats["embedded"], "upsert": stats["indexed"]}
+        rates = {s: round(done[s] / (busy[s] / share[s]), 1) if busy[s] else None for s in STAGES}
+        return {**stats, "elapsed_s": round(wall, 1), "docs_per_s": round((stats["indexed"] + stats["skipped"]) / wall, 1), "stage_docs_per_s": rates}
+
+    def flush():
+        nonlocal buf, buf_keys, buf_bytes, txn
+        if not buf:
+            return
+        start = time.perf_counter()
+        txn = index_documents(buf, col=col)
+        busy["upsert"] += time.perf_counter() - start
+        checkpoint.mark(buf_keys)
+        stats["indexed"] += len(buf)
+        stats["transactions"] += 1
+        buf, buf_keys, buf_bytes = [], [], 0
+
+    def collect(out: Dict, sigs: Dict[str, str]):
+        nonlocal buf_bytes
+        busy["parse"] += out["parse_s"]
+        busy["embed"] += out["embed_s"]
+        stats["parsed"] += out["parsed"]
+        stats["embedded"] += out["embedded"]
+        stats["skipped"] += len(out["skipped"])
+        stats["failed"] += len(out["failed"])
+        checkpoint.mark(
+            [(key, sigs.get(key), vid, "skipped", None) for key, vid in out["skipped"]]
+            + [(key, sigs.get(key), None, "failed", err) for key, err in out["failed"]]
+        )
+        for keys, item in out["items"]:
+            buf.append(item)
+            buf_keys.extend((key, sigs.get(key), item["id"], "indexed", None) for key in keys)
+            buf_bytes += _payload_bytes(item)
+            if buf_bytes >= txn_bytes or len(buf) >= txn_docs:
+                flush()
+
+    if workers == 1:
+        pool = _Inline()
+    else:
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            # Fresh interpreters: forked children would inherit open SQLite handles
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(max(1, (os.cpu_count() or 1) // workers),),
+        )
+    inflight = {}
+    sources = iter(sources)
+    try:
+        while True:
+            # Keep at most 2 tasks per worker queued so memory stays bounded
+            while len(inflight) < 2 * workers:
+                page = list(islice(sources, task_size))
+                if not page:
+                    break
+                stats["seen"] += len(page)
+                skip = checkpoint.done(page, retry_failed)
+                stats["resumed"] += len(skip)
+                todo = [s for s in page if s["key"] not in skip]
+                if todo:
+                    inflight[pool.submit(process_task, todo)] = {s["key"]: s.get("sig") for s in todo}
+            if not inflight:
+                break
+            done, _ = wait(list(inflight), return_when=FIRST_COMPLETED)
+            for fut in done:
+                # Per-file problems are reported inside the task; an exception
+                # here (model, store, pool) aborts the run and leaves the
+                # task's files unrecorded, so a rerun picks them up
+                collect(fut.result(), inflight.pop(fut))
+            if report is not None and time.perf_counter() - last_report >= report_every:
+                last_report = time.perf_counter()
+                report(snapshot())
+        flush()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    if txn is not None:
+        try:
+            txn.poll_completion(target_status="complete", max_attempts=10)
+        except Exception as e:
+            print(f"Warning: indexing status poll failed: {e}")
+    metrics.incr("ingest.bulk_documents", stats["indexed"])
+    return snapshot()
@@ -1,19 +1,88 @@
-from sentence_transformers import SentenceTransformer
+import hashlib
+import threading
 from ..config import settings
+from .cache import TTLCache, normalize_text
+from ..core.metrics import metrics
+
+def content_hash(text: str) -> str:
+    # Whitespace-insensitive, so re-extracted copies of a resume hash the same
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+def model_key() -> str:
+    # Embedding cache namespace: vectors from another model never mix
+    return f"{settings.EMBEDDING_MODEL}@{settings.EMBEDDING_BACKEND}"
 
 class EmbedderService:
     _model = None
+    _load_lock = threading.Lock()
+    _warm_thread = None
+    _query_cache = TTLCache(settings.QUERY_CACHE_SIZE, settings.QUERY_CACHE_TTL)
+    metrics.register_cache("query_embeddings", _query_cache)
 
     @classmethod
     def get_model(cls):
         if cls._model is None:
-            cls._model = SentenceTransformer(settings.EMBEDDING_MODEL)
+            with cls._load_lock:
+                if cls._model is None:
+                    # Deferred: the torch backend pulls in sentence_transformers + torch
+                    from .embedding_backends import load_backend
+                    with metrics.span("embedder.load"):
+                        cls._model = load_backend(settings.EMBEDDING_BACKEND, settings.EMBEDDING_MODEL)
         return cls._model
 
+    @classmethod
+    def is_ready(cls) -> bool:
+        return cls._model is not None
+
+    @classmethod
+    def warm_up(cls, background: bool = True):
+        # Load the model and run one forward pass so the first real query is fast
+        def run():
+            try:
+                cls.get_model().encode("warm up")
+            except Exception as e:
+                print(f"Warning: embedding model warm-up failed: {e}")
+
+        if not background:
+            run()
+            return None
+        with cls._load_lock:
+            if cls._warm_thread is None:
+                cls._warm_thread = threading.Thread(target=run, name="embedder-warmup", daemon=True)
+                cls._warm_thread.start()
+        return cls._warm_thread
+
     @classmethod
     def encode(cls, text: str) -> list:
         return cls.get_model().encode(text).tolist()
     
     @classmethod
     def encode_batch(cls, texts: list) -> list:
-        return cls.get_model().encode(texts, normalize_embeddings=True, convert_to_numpy=True).tolist()
\ No newline at end of file
+        return cls.get_model().encode(texts, normalize_embeddings=True, convert_to_numpy=True).tolist()
+
+    @classmethod
+    def encode_query(cls, text: str) -> list:
+        # Recruiters resubmit the same JD a lot; skip the forward pass for repeats
+        key = (normalize_text(text), settings.EMBEDDING_MODEL, settings.EMBEDDING_BACKEND)
+        vec = cls._query_cache.get(key)
+        if vec is None:
+            vec = cls.encode(text)
+            cls._query_cache.set(key, vec)
+        return list(vec)
+
+    @classmethod
+    def encode_queries(cls, texts: list) -> list:
+        # Cached lookups first; every miss goes through a single encode_batch call
+        keys = [(normalize_text(t), settings.EMBEDDING_MODEL, settings.EMBEDDING_BACKEND) for t in texts]
+        vecs = [cls._query_cache.get(k) for k in keys]
+        pending = {}
+        for i, vec in enumerate(vecs):
+            if vec is None:
+                pending.setdefault(keys[i], []).append(i)
+        if pending:
+            encoded = cls.encode_batch([texts[idxs[0]] for idxs in pending.values()])
+            for (key, idxs), vec in zip(pending.items(), encoded):
+                cls._query_cache.set(key, vec)
+                for i in idxs:
+                    vecs[i] = vec
+        return [list(v) for v in vecs]
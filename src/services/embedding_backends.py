@@ -0,0 +1,143 @@
+import os
+import re
+from typing import List
+import numpy as np
+from ..config import settings
+
+# Embedding backends share the subset of SentenceTransformer.encode that
+# EmbedderService uses: a str or list of str in, numpy array(s) out.
+
+EMBEDDING_DIM = 384
+
+
+class TorchBackend:
+    name = "torch"
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        if settings.EMBEDDING_THREADS:
+            import torch
+            torch.set_num_threads(settings.EMBEDDING_THREADS)
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts, normalize_embeddings: bool = True, convert_to_numpy: bool = True, **kwargs):
+        return self.model.encode(texts, normalize_embeddings=normalize_embeddings, convert_to_numpy=True)
+
+
+class OnnxBackend:
+    # Mean-pooled, L2-normalized transformer output via ONNX Runtime, which
+    # reproduces the all-MiniLM-L6-v2 sentence-transformers pipeline.
+    name = "onnx"
+
+    def __init__(self, model_name: str, model_dir: str | None = None, quantize: bool | None = None):
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError("EMBEDDING_BACKEND=onnx requires onnxruntime (pip install onnxruntime)")
+        from transformers import AutoTokenizer
+
+        quantize = settings.ONNX_QUANTIZE if quantize is None else quantize
+        path = onnx_model_path(model_name, model_dir, quantize)
+        if not os.path.exists(path):
+            export_onnx(model_name, model_dir, quantize)
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if settings.EMBEDDING_THREADS:
+            opts.intra_op_num_threads = settings.EMBEDDING_THREADS
+        opts.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(path, sess_options=opts, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.max_length = settings.EMBEDDING_MAX_LENGTH
+        self.batch_size = settings.EMBEDDING_BATCH_SIZE
+
+    def _encode_chunk(self, texts: List[str]) -> np.ndarray:
+        enc = self.tokenizer(texts, padding=True, truncation=True, max_length=self.max_length, return_tensors="np")
+        feeds = {k: v.astype(np.int64) for k, v in enc.items() if k in self.input_names}
+        hidden = self.session.run(None, feeds)[0]
+        mask = enc["attention_mask"][..., None].astype(np.float32)
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def encode(self, texts, normalize_embeddings: bool = True, convert_to_numpy: bool = True, **kwargs):
+        single = isinstance(texts, str)
+        items = [texts] if single else list(texts)
+        if not items:
+            return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        # Length-sorted chunks keep padding (and wasted FLOPs) to a minimum
+        order = sorted(range(len(items)), key=lambda i: len(items[i]))
+        out = np.empty((len(items), EMBEDDING_DIM), dtype=np.float32)
+        for start in range(0, len(order), self.batch_size):
+            idx = order[start:start + self.batch_size]
+            out[idx] = self._encode_chunk([items[i] for i in idx])
+        # The sentence-transformers pipeline ends in a Normalize layer, so always normalize
+        out /= np.clip(np.linalg.norm(out, axis=1, keepdims=True), 1e-12, None)
+        return out[0] if single else out
+
+
+def onnx_model_path(model_name: str, model_dir: str | None = None, quantize: bool = True) -> str:
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "__", model_name)
+    base = os.path.join(model_dir or settings.ONNX_MODEL_DIR, slug)
+    return os.path.join(base, "model_int8.onnx" if quantize else "model.onnx")
+
+
+def export_onnx(model_name: str, model_dir: str | None = None, quantize: bool = True) -> str:
+    # One-off export (needs torch + transformers); runtime hosts only need onnxruntime
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    fp32_path = onnx_model_path(model_name, model_dir, quantize=False)
+    os.makedirs(os.path.dirname(fp32_path), exist_ok=True)
+    if not os.path.exists(fp32_path):
+        print(f"📦 Exporting {model_name} to ONNX...")
+        model = AutoModel.from_pretrained(model_name).eval()
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        sample = tokenizer(["warm up"], return_tensors="pt")
+        names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+        dynamic = {n: {0: "batch", 1: "seq"} for n in names}
+        dynamic["last_hidden_state"] = {0: "batch", 1: "seq"}
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                tuple(sample[n] for n in names),
+                fp32_path,
+                input_names=names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic,
+                opset_version=14,
+            )
+    if not quantize:
+        return fp32_path
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    int8_path = onnx_model_path(model_name, model_dir, quantize=True)
+    print("🗜️ Quantizing to int8...")
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    return int8_path
+
+
+def load_backend(name: str | None = None, model_name: str | None = None):
+    name = (name or settings.EMBEDDING_BACKEND).lower()
+    model_name = model_name or settings.EMBEDDING_MODEL
+    if name == "torch":
+        return TorchBackend(model_name)
+    if name == "onnx":
+        return OnnxBackend(model_name)
+    raise ValueError(f"Unknown EMBEDDING_BACKEND '{name}' (expected 'torch' or 'onnx')")
+
+
+def check_parity(texts: List[str], candidate=None, reference=None) -> dict:
+    # Cosine similarity between a candidate backend and the torch reference
+    candidate = candidate or load_backend("onnx")
+    reference = reference or load_backend("torch")
+    a = np.asarray(candidate.encode(texts), dtype=np.float32)
+    b = np.asarray(reference.encode(texts), dtype=np.float32)
+    if a.shape != b.shape:
+        raise ValueError(f"Shape mismatch: {candidate.name} {a.shape} vs {reference.name} {b.shape}")
+    cos = (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+    return {
+        "dim": int(a.shape[1]),
+        "min_cosine": float(cos.min()),
+        "mean_cosine": float(cos.mean()),
+        "max_norm_error": float(np.abs(np.linalg.norm(a, axis=1) - 1.0).max()),
+    }
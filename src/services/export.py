@@ -0,0 +1,122 @@
+import csv
+import json
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, TextIO
+from ..core.db_client import db
+from ..core.doc_store import doc_store
+from .search import iter_filtered, iter_matches
+
+# Columns exported when none are requested. Full resume text is opt-in
+# ("text") because it dominates the size of a talent-pool export.
+DEFAULT_COLUMNS = ["id", "name", "role", "location", "visa", "clearance", "exp", "skills", "score"]
+FORMATS = ("jsonl", "csv", "parquet")
+
+
+def project(r: Dict, columns: List[str]) -> Dict:
+    meta = r.get("metadata") or {}
+    row = {}
+    for col in columns:
+        if col in ("id", "score", "text", "match_explanation"):
+            row[col] = r.get(col)
+        else:
+            row[col] = meta.get(col)
+        if isinstance(row[col], (list, dict)):
+            row[col] = ", ".join(map(str, row[col])) if isinstance(row[col], list) else json.dumps(row[col])
+    return row
+
+
+class PoolNotAuthoritative(Exception):
+    pass
+
+
+def check_pool_coverage():
+    # Cosdata cannot list a collection's vectors, so whole-pool exports read
+    # the local doc store. That is only complete when it holds exactly what
+    # the collection does: not when resumes were ingested from another host
+    # or before the store existed, or after the collection was reset.
+    remote = db.vector_count()
+    local = len(doc_store)
+    if remote is None:
+        raise PoolNotAuthoritative(
+            "Cannot verify the local document store against the collection (vector count unavailable). "
+            "Export from the host that ingested the resumes, or allow an incomplete export explicitly."
+        )
+    if remote != local:
+        raise PoolNotAuthoritative(
+            f"The local document store holds {local:,} resumes but the collection holds {remote:,}. "
+            "Export from the host that ingested them, or allow an incomplete export explicitly."
+        )
+
+
+def iter_export_rows(query: str | None = None, filters: Dict | None = None, strictness: float = 0.0, limit: int | None = None, columns: List[str] | None = None, chunk: int = 1000, allow_incomplete: bool = False) -> Iterator[Dict]:
+    # With a query: the ranked, filtered result set (up to `limit` retrieved
+    # hits), retrieved in pages. Without one: the whole pool, streamed from
+    # the local doc store in `chunk`-sized pages and filtered locally; raises
+    # PoolNotAuthoritative up front (before any row) unless the store matches
+    # the collection or `allow_incomplete` is set.
+    columns = columns or DEFAULT_COLUMNS
+    if query and query.strip():
+        rows = iter_matches(query, strictness, filters, limit=limit or 1000)
+    else:
+        if not allow_incomplete:
+            check_pool_coverage()
+        # Scores only exist relative to a query
+        filters = {k: v for k, v in (filters or {}).items() if k != "min_score"}
+        rows = iter_filtered(doc_store.iter_all(chunk=chunk), 0.0, filters, chunk=chunk)
+        if limit:
+            rows = islice(rows, limit)
+    return (project(r, columns) for r in rows)
+
+
+def write_jsonl(rows: Iterable[Dict], fp: TextIO) -> int:
+    n = 0
+    for row in rows:
+        fp.write(json.dumps(row, ensure_ascii=False) + "\n")
+        n += 1
+    return n
+
+
+def write_csv(rows: Iterable[Dict], fp: TextIO, columns: List[str]) -> int:
+    writer = csv.DictWriter(fp, fieldnames=columns, extrasaction="ignore")
+    writer.writeheader()
+    n = 0
+    for row in rows:
+        writer.writerow(row)
+        n += 1
+    return n
+
+
+def write_parquet(rows: Iterable[Dict], path: str, columns: List[str], chunk: int = 5000) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export requires pyarrow (pip install pyarrow)")
+
+    # Everything is written as strings so every row group shares one schema
+    schema = pa.schema([(col, pa.string()) for col in columns])
+    n = 0
+    rows = iter(rows)
+    with pq.ParquetWriter(path, schema) as writer:
+        while True:
+            page = list(islice(rows, chunk))
+            if not page:
+                break
+            data = {col: [None if row.get(col) is None else str(row.get(col)) for row in page] for col in columns}
+            writer.write_table(pa.Table.from_pydict(data, schema=schema))
+            n += len(page)
+    return n
+
+
+def export(fmt: str, out: str, columns: List[str] | None = None, **kwargs) -> int:
+    # Returns the number of rows written to `out`
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}' (expected one of {', '.join(FORMATS)})")
+    columns = columns or DEFAULT_COLUMNS
+    rows = iter_export_rows(columns=columns, **kwargs)
+    if fmt == "parquet":
+        return write_parquet(rows, out, columns)
+    with open(out, "w", encoding="utf-8", newline="") as fp:
+        if fmt == "csv":
+            return write_csv(rows, fp, columns)
+        return write_jsonl(rows, fp)
@@ -0,0 +1,111 @@
+import re
+from typing import Dict, List
+from .skills import get_taxonomy
+
+# Structured metadata pulled out of resume text once, at ingest. Every rule is
+# compiled at import; extract_metadata() only returns fields it found so
+# caller-supplied metadata can take precedence. Skills come from the taxonomy.
+
+_EXP_RE = re.compile(
+    r"\b(\d{1,2})\s*\+?\s*(?:years?|yrs?)(?:\s+of)?(?:\s+(?:professional|industry|hands-on|relevant|total|work))?\s+(?:experience|exp)\b",
+    re.IGNORECASE,
+)
+_EXP_LOOSE_RE = re.compile(r"\b(\d{1,2})\s*\+?\s*(?:years?|yrs?)\b", re.IGNORECASE)
+
+# Most specific first
+_CLEARANCE_RULES = [
+    ("TS/SCI", re.compile(r"\bTS\s*/\s*SCI\b|\btop\s+secret\s*/\s*sci\b", re.IGNORECASE)),
+    ("Top Secret", re.compile(r"\btop[\s-]+secret\b", re.IGNORECASE)),
+    ("Secret", re.compile(r"\bsecret\s+clearance\b|\bclearance:?\s+secret\b", re.IGNORECASE)),
+    ("Public Trust", re.compile(r"\bpublic\s+trust\b", re.IGNORECASE)),
+]
+
+_VISA_RULES = [
+    ("US Citizen", re.compile(r"\b(?:US|U\.S\.|United States)\s+citizen(?:ship)?\b", re.IGNORECASE)),
+    ("Green Card", re.compile(r"\bgreen\s+card\b|\bpermanent\s+resident\b", re.IGNORECASE)),
+    ("H1B", re.compile(r"\bH-?1B\b", re.IGNORECASE)),
+    ("EU Citizen", re.compile(r"\bEU\s+citizen\b", re.IGNORECASE)),
+    ("Asian Citizen", re.compile(r"\bAsian\s+citizen\b", re.IGNORECASE)),
+    ("Requires Sponsorship", re.compile(r"\b(?:visa\s+)?sponsorship\s+required\b|\brequires?\s+(?:visa\s+)?sponsorship\b", re.IGNORECASE)),
+]
+
+_LOCATION_RE = re.compile(
+    r"\b(?i:based\s+in|located\s+in|location:|lives\s+in|relocating\s+to)\s+([A-Z][A-Za-z .'-]{1,40}?)(?=[.,;\n]|$)"
+)
+_REMOTE_RE = re.compile(r"\b(?:fully\s+)?remote\b", re.IGNORECASE)
+
+_ROLE_RE = re.compile(
+    r"\b((?:(?:senior|junior|lead|principal|staff|chief)\s+)?"
+    r"(?:(?:software|backend|back-end|frontend|front-end|full[\s-]?stack|devops|cloud|data|ml|ai|machine\s+learning|python|java|site\s+reliability|platform|security|qa|mobile|product)\s+)?"
+    r"(?:engineer|developer|architect|scientist|researcher|analyst|manager|tech\s+lead|devops\s+lead|lead))\b",
+    re.IGNORECASE,
+)
+
+# Values the UI fills in when a field was left blank; extraction may override them
+PLACEHOLDERS = {"", "unknown", "none", "n/a", "applicant"}
+
+
+def extract_experience(text: str) -> int | None:
+    years = [int(m.group(1)) for m in _EXP_RE.finditer(text)]
+    if not years:
+        years = [int(m.group(1)) for m in _EXP_LOOSE_RE.finditer(text)]
+    years = [y for y in years if y <= 60]
+    return max(years) if years else None
+
+
+def extract_skills(text: str) -> List[str]:
+    taxonomy = get_taxonomy()
+    return [taxonomy.names[i] for i in taxonomy.find_ids(text)]
+
+
+def _first(rules, text: str) -> str | None:
+    for label, pattern in rules:
+        if pattern.search(text):
+            return label
+    return None
+
+
+def extract_metadata(text: str) -> Dict:
+    text = text or ""
+    found = {}
+    exp = extract_experience(text)
+    if exp is not None:
+        found["exp"] = exp
+    clearance = _first(_CLEARANCE_RULES, text)
+    if clearance:
+        found["clearance"] = clearance
+    visa = _first(_VISA_RULES, text)
+    if visa:
+        found["visa"] = visa
+    m = _LOCATION_RE.search(text)
+    if m:
+        found["location"] = m.group(1).strip()
+    elif _REMOTE_RE.search(text):
+        found["location"] = "Remote"
+    m = _ROLE_RE.search(text[:500])
+    if m:
+        found["role"] = " ".join(w if any(c.isupper() for c in w) else w.capitalize() for w in m.group(1).split())
+    return found
+
+
+def build_metadata(text: str, provided: Dict | None = None) -> Dict:
+    # Extracted fields, overridden by caller-supplied ones, plus canonical
+    # skills and the per-document skill bitset
+    return get_taxonomy().annotate(merge_metadata(extract_metadata(text), provided), text)
+
+
+def merge_metadata(extracted: Dict, provided: Dict | None) -> Dict:
+    # Caller-supplied values win unless they are blanks/placeholders
+    merged = dict(extracted)
+    for key, value in (provided or {}).items():
+        if isinstance(value, str) and value.strip().lower() in PLACEHOLDERS and key in extracted:
+            continue
+        if value is None and key in extracted:
+            continue
+        merged[key] = value
+    if "exp" in merged:
+        try:
+            merged["exp"] = int(merged["exp"])
+        except (TypeError, ValueError):
+            merged["exp"] = extracted.get("exp")
+    return merged
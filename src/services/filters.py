@@ -0,0 +1,104 @@
+from typing import Callable, Dict, List, Tuple
+from ..config import settings
+
+# Metadata fields Cosdata can evaluate server-side (exact match only)
+PUSHDOWN_FIELDS = ("visa", "clearance")
+
+
+class CompiledFilters:
+    def __init__(self, server: Dict | None = None, local: List[Tuple[str, Callable[[Dict], bool]]] | None = None, text_terms: bool = False):
+        # server: metadata predicate sent with the query (may be None)
+        # local: (name, predicate) pairs applied to each normalized result
+        # text_terms: must/exclude keywords, checked by the per-query matcher
+        self.server = server
+        self.local = local or []
+        self.text_terms = text_terms
+
+    def matches(self, r: Dict) -> bool:
+        return self.failure(r) is None
+
+    def failure(self, r: Dict) -> str | None:
+        # Name of the first predicate that rejects `r`, for drop accounting
+        for name, pred in self.local:
+            if not pred(r):
+                return name
+        return None
+
+    def __bool__(self):
+        return bool(self.server or self.local or self.text_terms)
+
+    @property
+    def can_drop(self) -> bool:
+        # True when client-side checks may discard server hits
+        return bool(self.local or self.text_terms)
+
+
+def _meta_or_text(field: str, value: str) -> Callable[[Dict], bool]:
+    needle = value.lower()
+
+    def pred(r: Dict) -> bool:
+        stored = (r.get("metadata") or {}).get(field)
+        if stored not in (None, "", "Unknown"):
+            return needle in str(stored).lower()
+        # Documents indexed before ingest-time extraction: scan the text
+        return needle in (r.get("text") or "").lower()
+    return pred
+
+
+def _min_exp(min_exp) -> Callable[[Dict], bool]:
+    def pred(r: Dict) -> bool:
+        try:
+            exp_val = (r.get("metadata") or {}).get("exp")
+            if exp_val is None:
+                return False
+            return int(exp_val) >= int(min_exp)
+        except Exception:
+            # If exp missing or unparsable, treat as failing the min_exp requirement
+            return False
+    return pred
+
+
+def _meta_contains(field: str, value: str) -> Callable[[Dict], bool]:
+    needle = value.lower()
+    return lambda r: needle in str((r.get("metadata") or {}).get(field, "")).lower()
+
+
+def _min_score(min_score) -> Callable[[Dict], bool]:
+    def pred(r: Dict) -> bool:
+        try:
+            return float(r.get("score") or 0.0) >= float(min_score)
+        except Exception:
+            return True
+    return pred
+
+
+def compile_filters(filters: Dict | None, pushdown: bool | None = None) -> CompiledFilters:
+    if pushdown is None:
+        pushdown = settings.FILTER_PUSHDOWN
+    if not filters:
+        return CompiledFilters()
+
+    server_terms = []
+    local = []
+    for field in PUSHDOWN_FIELDS:
+        if filters.get(field):
+            if pushdown:
+                server_terms.append({"Is": {"field": field, "value": filters[field]}})
+            # Still checked locally: the sparse leg of a hybrid query ignores
+            # metadata filters, so fused results can include non-matching hits
+            local.append((field, _meta_or_text(field, filters[field])))
+    if filters.get("min_exp") is not None:
+        local.append(("min_exp", _min_exp(filters["min_exp"])))
+    if filters.get("role_contains"):
+        local.append(("role", _meta_contains("role", filters["role_contains"])))
+    if filters.get("location_contains"):
+        local.append(("location", _meta_contains("location", filters["location_contains"])))
+    if filters.get("min_score") is not None:
+        local.append(("min_score", _min_score(filters["min_score"])))
+
+    server = None
+    if len(server_terms) == 1:
+        server = server_terms[0]
+    elif server_terms:
+        server = {"And": server_terms}
+    return CompiledFilters(server=server, local=local, text_terms=bool(filters.get("must") or filters.get("exclude")))
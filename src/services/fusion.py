@@ -0,0 +1,69 @@
+from typing import Dict, List, Sequence
+import numpy as np
+
+# Local fusion of independently retrieved result lists ("legs"), used when
+# FUSION_MODE=client. Scoring is one vectorized pass over an (legs x ids)
+# rank / score matrix.
+
+METHODS = ("rrf", "weighted")
+
+
+def fuse(legs: Dict[str, List[Dict]], method: str = "rrf", k: float = 60.0, weights: Sequence[float] | None = None, top_k: int | None = None) -> List[Dict]:
+    # legs: {"dense": [...], "sparse": [...]}, each already ranked and
+    # normalized (id / text / metadata / score). "rrf" sums w / (k + rank);
+    # "weighted" sums w * min-max-normalized leg score. Each leg's raw score
+    # is kept as "<leg>_score".
+    if method not in METHODS:
+        raise ValueError(f"Unknown fusion method '{method}' (expected one of {', '.join(METHODS)})")
+    names = list(legs)
+    weights = np.asarray(weights if weights is not None else [1.0] * len(names), dtype=np.float64)
+
+    docs: Dict[str, Dict] = {}
+    for name in names:
+        for r in legs[name]:
+            rid = r.get("id")
+            if rid is None:
+                continue
+            known = docs.get(rid)
+            # Prefer whichever leg carried the text
+            if known is None or (not known.get("text") and r.get("text")):
+                docs[rid] = {**(known or {}), **r}
+    if not docs:
+        return []
+    index = {rid: i for i, rid in enumerate(docs)}
+
+    ranks = np.full((len(names), len(docs)), np.inf)
+    scores = np.full((len(names), len(docs)), np.nan)
+    for li, name in enumerate(names):
+        seen = set()
+        for rank, r in enumerate(legs[name], 1):
+            rid = r.get("id")
+            if rid is None or rid in seen:
+                continue
+            seen.add(rid)
+            ranks[li, index[rid]] = rank
+            scores[li, index[rid]] = float(r.get("score") or 0.0)
+
+    present = np.isfinite(ranks)
+    if method == "rrf":
+        contrib = np.where(present, 1.0 / (k + np.where(present, ranks, 0.0)), 0.0)
+    else:
+        low = np.nanmin(np.where(present, scores, np.inf), axis=1, keepdims=True)
+        high = np.nanmax(np.where(present, scores, -np.inf), axis=1, keepdims=True)
+        span = np.where(high > low, high - low, 1.0)
+        contrib = np.where(present, np.where(high > low, (np.nan_to_num(scores) - low) / span, 1.0), 0.0)
+    fused = (weights[:, None] * contrib).sum(axis=0)
+
+    # Ties go to the document with the better best rank
+    order = np.lexsort((ranks.min(axis=0), -fused))
+    if top_k is not None:
+        order = order[:top_k]
+    ids = list(docs)
+    out = []
+    for i in order.tolist():
+        r = dict(docs[ids[i]])
+        for li, name in enumerate(names):
+            r[f"{name}_score"] = None if np.isnan(scores[li, i]) else float(scores[li, i])
+        r["score"] = float(fused[i])
+        out.append(r)
+    return out
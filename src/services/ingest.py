@@ -0,0 +1,108 @@
+import json
+from typing import List, Dict, Tuple
+from ..config import settings
+from ..core.analytics import analytics
+from ..core.db_client import db
+from ..core.doc_store import doc_store
+from ..core.embedding_cache import embedding_cache
+from ..core.metrics import metrics
+from ..core.vector_mirror import get_mirror
+from .embedder import EmbedderService, content_hash, model_key
+from .extract import build_metadata
+from .search import invalidate_result_cache
+
+def content_id(text: str) -> str:
+    return f"doc-{content_hash(text)[:32]}"
+
+def embed_documents(texts: List[str]) -> List[List[float]]:
+    # Persistent cache first; every miss goes through a single encode_batch call
+    hashes = [content_hash(t) for t in texts]
+    model = model_key()
+    cached = embedding_cache.get_many(hashes, model)
+    missing = {}
+    for h, t in zip(hashes, texts):
+        if h not in cached:
+            missing.setdefault(h, t)
+    metrics.incr("ingest.embed_cache", len(texts) - len(missing), result="hit")
+    metrics.incr("ingest.embed_cache", len(missing), result="miss")
+    if missing:
+        with metrics.span("ingest.embed"):
+            vecs = EmbedderService.encode_batch(list(missing.values()))
+        fresh = dict(zip(missing, vecs))
+        embedding_cache.put_many(fresh.items(), model)
+        cached.update(fresh)
+    return [cached[h] for h in hashes]
+
+def index_documents(batch: List[Dict], col=None, wait: bool = False):
+    # Single write path into the collection so caches can be kept coherent
+    if col is None:
+        col = db.get_collection()
+    with metrics.span("ingest.upsert"):
+        with col.transaction() as txn:
+            txn.batch_upsert_vectors(batch)
+    # Leaving the block committed the transaction (or raised); the local
+    # stores below only ever record committed batches, and with `wait` only
+    # once indexing has actually completed
+    if wait:
+        with metrics.span("ingest.poll"):
+            status, ok = txn.poll_completion(target_status="complete", max_attempts=10)
+        if not ok:
+            raise RuntimeError(f"Indexing did not complete (status: {status})")
+    metrics.incr("ingest.documents", len(batch))
+    doc_store.put_many(batch)
+    analytics.apply(batch)
+    mirror = get_mirror()
+    if mirror is not None:
+        mirror.put_many(batch)
+    invalidate_result_cache()
+    return txn
+
+def prepare_documents(docs: List[Dict]) -> Tuple[List[str], List[Dict], int]:
+    # docs: [{"text", "metadata", optional "id"}]. Returns the id of every
+    # usable doc, the items that need (re)indexing and how many were unchanged.
+    # Ids default to a content hash, so re-uploading the same resume is a
+    # no-op instead of a duplicate vector.
+    items = {}
+    ids = []
+    for d in docs:
+        text = d.get("text") or ""
+        if not text.strip():
+            continue
+        vid = d.get("id") or content_id(text)
+        ids.append(vid)
+        # Structured fields are extracted once here so query-time filters
+        # compare metadata instead of scanning text
+        with metrics.span("ingest.extract"):
+            meta = build_metadata(text, d.get("metadata"))
+        items[vid] = {"id": vid, "text": text, "metadata": meta}
+
+    stored = doc_store.get_many(list(items))
+    unchanged = {
+        vid for vid, item in items.items()
+        if vid in stored
+        and stored[vid]["text"] == item["text"]
+        and stored[vid]["metadata"] == json.loads(json.dumps(item["metadata"]))
+    }
+    if unchanged:
+        # The local store can be ahead of the collection (reset or recreated
+        # from another host, or a fresh collection opened after an error), so
+        # only documents Cosdata still holds are skipped. Unverifiable ones
+        # are re-indexed; their vectors come from the embedding cache.
+        present = db.existing_ids(list(unchanged))
+        stale = unchanged - present if present is not None else unchanged
+        if stale:
+            metrics.incr("ingest.store_stale", len(stale))
+            unchanged -= stale
+    pending = [item for vid, item in items.items() if vid not in unchanged]
+    # Unchanged documents and repeats within this batch
+    skipped = len(ids) - len(pending)
+    metrics.incr("ingest.skipped", skipped)
+    return ids, pending, skipped
+
+def ingest_documents(docs: List[Dict], col=None, wait: bool = False) -> Dict:
+    ids, pending, skipped = prepare_documents(docs)
+    if pending:
+        vecs = embed_documents([item["text"] for item in pending])
+        batch = [{**item, "dense_values": vec} for item, vec in zip(pending, vecs)]
+        index_documents(batch, col=col, wait=wait)
+    return {"ids": ids, "indexed": len(pending), "skipped": skipped}
@@ -0,0 +1,174 @@
+import queue
+import threading
+from typing import Dict, List
+from ..config import settings
+from ..core.db_client import db
+from ..core.job_store import job_store
+from ..core.metrics import metrics
+from .ingest import embed_documents, index_documents, prepare_documents
+from .parser import iter_extracted
+
+# Background ingestion: parse -> micro-batched embed -> chunked upsert, each
+# stage on its own thread and joined by bounded queues, so stages overlap and
+# at most a few queues' worth of documents is ever held in memory. Progress
+# and failures go to the job store, which the UI polls.
+
+_DONE = object()
+_stops: Dict[str, threading.Event] = {}
+_stops_lock = threading.Lock()
+
+
+def start_ingest_job(files) -> str:
+    files = list(files)
+    job_id = job_store.create("ingest", len(files))
+    stop = threading.Event()
+    with _stops_lock:
+        _stops[job_id] = stop
+    threading.Thread(target=_run, args=(job_id, files, stop), name=f"ingest-{job_id}", daemon=True).start()
+    return job_id
+
+
+def cancel_job(job_id: str) -> bool:
+    with _stops_lock:
+        stop = _stops.get(job_id)
+    if stop is None:
+        return False
+    stop.set()
+    return True
+
+
+def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+    # Blocks while the next stage is behind (backpressure) but gives up on stop
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.2)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _parse_stage(job_id: str, files: List, out: queue.Queue, stop: threading.Event):
+    for parsed in iter_extracted(files):
+        if stop.is_set():
+            return
+        if parsed["error"]:
+            job_store.add_error(job_id, parsed["name"], parsed["error"])
+            continue
+        if not (parsed["text"] or "").strip():
+            # e.g. image-only PDFs; prepare_documents would drop them silently
+            job_store.add_error(job_id, parsed["name"], "no text extracted")
+            continue
+        job_store.advance(job_id, parsed=1)
+        # Visa, clearance, experience, location, role and skills are extracted at ingest
+        if not _put(out, {"text": parsed["text"], "metadata": {"name": parsed["name"]}}, stop):
+            return
+
+
+def _embed_stage(job_id: str, inq: queue.Queue, out: queue.Queue, stop: threading.Event):
+    # Takes whatever is queued (up to INGEST_EMBED_BATCH) per model call, so a
+    # slow parser never leaves documents waiting for a full batch
+    while not stop.is_set():
+        try:
+            item = inq.get(timeout=0.2)
+        except queue.Empty:
+            continue
+        docs = []
+        while item is not _DONE:
+            docs.append(item)
+            if len(docs) >= settings.INGEST_EMBED_BATCH:
+                break
+            try:
+                item = inq.get_nowait()
+            except queue.Empty:
+                break
+        if docs:
+            _, pending, skipped = prepare_documents(docs)
+            job_store.advance(job_id, skipped=skipped)
+            if pending:
+                vecs = embed_documents([it["text"] for it in pending])
+                job_store.advance(job_id, embedded=len(pending))
+                if not _put(out, [{**it, "dense_values": vec} for it, vec in zip(pending, vecs)], stop):
+                    return
+        if item is _DONE:
+            return
+
+
+def _upsert_stage(job_id: str, col, inq: queue.Queue, stop: threading.Event):
+    # One transaction per INGEST_UPSERT_CHUNK vectors; returns the last one
+    buf = []
+    txn = None
+    while not stop.is_set():
+        try:
+            batch = inq.get(timeout=0.2)
+        except queue.Empty:
+            continue
+        if batch is not _DONE:
+            buf.extend(batch)
+        if buf and (batch is _DONE or len(buf) >= settings.INGEST_UPSERT_CHUNK):
+            txn = index_documents(buf, col=col)
+            job_store.advance(job_id, indexed=len(buf))
+            buf = []
+        if batch is _DONE:
+            break
+    return txn
+
+
+def _run(job_id: str, files: List, stop: threading.Event):
+    errors = []
+
+    def guarded(name, stage, *args, then=None):
+        try:
+            return stage(*args)
+        except Exception as e:
+            errors.append(f"{name}: {e}")
+            stop.set()
+        finally:
+            if then is not None:
+                _put(then, _DONE, stop)
+
+    job_store.set_status(job_id, "running")
+    try:
+        col = db.get_collection()
+    except Exception as e:
+        with _stops_lock:
+            _stops.pop(job_id, None)
+        job_store.set_status(job_id, "failed", f"Database unavailable: {e}")
+        return
+
+    parsed_q = queue.Queue(maxsize=settings.INGEST_QUEUE_SIZE)
+    batch_q = queue.Queue(maxsize=max(1, settings.INGEST_QUEUE_SIZE // max(1, settings.INGEST_EMBED_BATCH)))
+    threads = [
+        threading.Thread(target=guarded, args=("parse", _parse_stage, job_id, files, parsed_q, stop), kwargs={"then": parsed_q}, daemon=True),
+        threading.Thread(target=guarded, args=("embed", _embed_stage, job_id, parsed_q, batch_q, stop), kwargs={"then": batch_q}, daemon=True),
+    ]
+    with metrics.span("ingest.job"):
+        for t in threads:
+            t.start()
+        txn = guarded("upsert", _upsert_stage, job_id, col, batch_q, stop)
+        for t in threads:
+            t.join()
+
+    cancelled = stop.is_set() and not errors
+    if txn is not None and not stop.is_set():
+        # Only the last transaction is waited on; earlier ones commit while later stages run
+        try:
+            with metrics.span("ingest.poll"):
+                poll_status, ok = txn.poll_completion(target_status="complete", max_attempts=10)
+            if not ok:
+                errors.append(f"index: indexing did not complete (status: {poll_status})")
+        except Exception as e:
+            errors.append(f"index: status poll failed: {e}")
+
+    with _stops_lock:
+        _stops.pop(job_id, None)
+    job = job_store.get(job_id) or {}
+    if errors:
+        status, message = "failed", "; ".join(errors)
+    elif cancelled:
+        status, message = "cancelled", "Cancelled"
+    else:
+        status = "completed"
+        message = f"Indexed {job.get('indexed', 0)} resumes" + (f" ({job['skipped']} already indexed)" if job.get("skipped") else "")
+    metrics.incr("ingest.jobs", status=status)
+    job_store.set_status(job_id, status, message)
@@ -0,0 +1,115 @@
+import re
+from typing import Dict, Iterable, List, Tuple
+from .skills import SkillTaxonomy, get_taxonomy
+
+
+def query_terms(query: str) -> List[str]:
+    return [w.strip(".,") for w in query.split() if len(w) > 2]
+
+
+class QueryMatcher:
+    # Compiled once per query: every must/exclude/query/skill term is found in a
+    # single pass over each document. A zero-width lookahead lets matches
+    # overlap; terms that are prefixes of a longer match at the same offset
+    # are filled in from a precomputed table, so the result equals running
+    # `term in text.lower()` for every term.
+    #
+    # With a taxonomy, skills are also compared as bitsets: a document's
+    # precomputed skill bits explain the match and can satisfy must-terms
+    # that name a skill (including via synonyms) without any text scan.
+    def __init__(self, must: Iterable[str] = (), exclude: Iterable[str] = (), terms: Iterable[str] = (), skills: Iterable[str] = (), taxonomy: SkillTaxonomy | None = None, skill_bits: int = 0, must_bits: Dict[str, int] | None = None):
+        self.must = self._clean(must)
+        self.exclude = self._clean(exclude)
+        self.terms = self._clean(terms)
+        self.skills = self._clean(skills)
+        self._display = {s.lower(): s for s in skills if s}
+        self.taxonomy = taxonomy
+        self.skill_bits = skill_bits
+        self.must_bits = must_bits or {}
+        vocab = sorted(set(self.must + self.exclude + self.terms + self.skills), key=len, reverse=True)
+        self._prefixes = {t: [u for u in vocab if u != t and t.startswith(u)] for t in vocab}
+        self._pattern = None
+        if vocab:
+            self._pattern = re.compile("(?=(" + "|".join(re.escape(t) for t in vocab) + "))", re.IGNORECASE)
+
+    @staticmethod
+    def _clean(words: Iterable[str]) -> List[str]:
+        return list(dict.fromkeys(w.lower() for w in words if w and w.strip()))
+
+    def scan(self, text: str) -> Dict[str, List[Tuple[int, int]]]:
+        hits: Dict[str, List[Tuple[int, int]]] = {}
+        if not self._pattern or not text:
+            return hits
+        for m in self._pattern.finditer(text):
+            found = m.group(1)
+            key = found.lower()
+            if key not in self._prefixes:
+                continue
+            start = m.start()
+            hits.setdefault(key, []).append((start, start + len(found)))
+            for shorter in self._prefixes[key]:
+                hits.setdefault(shorter, []).append((start, start + len(shorter)))
+        return hits
+
+    def passes(self, hits: Dict, strict: bool = False) -> bool:
+        return self.failure(hits, strict) is None
+
+    def doc_bits(self, meta: Dict | None) -> int | None:
+        return self.taxonomy.doc_bits(meta) if self.taxonomy is not None else None
+
+    def failure(self, hits: Dict, strict: bool = False, doc_bits: int | None = None) -> str | None:
+        for t in self.must:
+            if t in hits:
+                continue
+            bit = self.must_bits.get(t)
+            if bit and doc_bits is not None and doc_bits & bit:
+                continue
+            return "must"
+        if any(t in hits for t in self.exclude):
+            return "exclude"
+        if strict and any(t not in hits for t in self.terms):
+            return "strictness"
+        return None
+
+    def skills_found(self, hits: Dict, doc_bits: int | None = None) -> List[str]:
+        if doc_bits is not None:
+            return self.taxonomy.names_for_bits(self.skill_bits & doc_bits)
+        # Documents without (current) skill bits: the query's skills, found in text
+        return [self._display.get(s, s) for s in self.skills if s in hits]
+
+    def highlights(self, hits: Dict) -> List[List[int]]:
+        # Merged, sorted spans of positive terms for the UI to mark up
+        spans = sorted(
+            span
+            for term in self.must + self.terms + self.skills
+            for span in hits.get(term, [])
+        )
+        merged: List[List[int]] = []
+        for start, end in spans:
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        return merged
+
+
+def compile_matcher(query: str, filters: Dict | None = None) -> QueryMatcher:
+    # Query skills are resolved against the taxonomy once, here
+    filters = filters or {}
+    taxonomy = get_taxonomy()
+    skill_ids = taxonomy.find_ids(query)
+    must = filters.get("must") or ()
+    must_bits = {}
+    for term in must:
+        sid = taxonomy.lookup(term)
+        if sid is not None:
+            must_bits[term.lower()] = 1 << sid
+    return QueryMatcher(
+        must=must,
+        exclude=filters.get("exclude") or (),
+        terms=query_terms(query),
+        skills=[taxonomy.names[i] for i in skill_ids],
+        taxonomy=taxonomy,
+        skill_bits=taxonomy.to_bits(skill_ids),
+        must_bits=must_bits,
+    )
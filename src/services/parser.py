@@ -1,17 +1,230 @@
-import pypdf
+import multiprocessing
+import os
+import threading
+import time
+import zipfile
+from collections import deque
 from io import BytesIO
+from typing import Dict, Iterator, List
+from xml.etree import ElementTree
+from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+import pypdf
+from ..config import settings
+from ..core.metrics import metrics
+
+PDF_TYPE = "application/pdf"
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class ParseLimitExceeded(Exception):
+    pass
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = settings.PARSE_WORKERS or os.cpu_count() or 1
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                # Fresh interpreters: forking this multi-threaded process (UI,
+                # API, ingest stages) can leave a child holding a copied lock
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _reset_pool(stuck: ProcessPoolExecutor):
+    # cancel() cannot stop a task that is already running, so a hung parse
+    # would hold its worker for good. The whole pool is killed and replaced;
+    # files other callers had in flight on it see their futures cancelled or
+    # broken and resubmit them to the new pool.
+    global _pool
+    with _pool_lock:
+        if _pool is not stuck:
+            return
+        _pool = None
+    for proc in list((getattr(stuck, "_processes", None) or {}).values()):
+        proc.terminate()
+    stuck.shutdown(wait=False, cancel_futures=True)
+    metrics.incr("ingest.parse_pool_resets")
+
+
+def _detect_kind(name: str, mime: str, data: bytes) -> str:
+    name = (name or "").lower()
+    if mime == PDF_TYPE or name.endswith(".pdf") or data[:5] == b"%PDF-":
+        return "pdf"
+    if mime == DOCX_TYPE or name.endswith(".docx"):
+        return "docx"
+    return "text"
+
+
+def _read_upload(uploaded_file) -> bytes:
+    # Reject oversized uploads before pulling them into memory
+    size = getattr(uploaded_file, "size", None)
+    if size is not None and size > settings.PARSE_MAX_BYTES:
+        raise ParseLimitExceeded(f"file is {size} bytes (limit {settings.PARSE_MAX_BYTES})")
+    data = uploaded_file.read(settings.PARSE_MAX_BYTES + 1) or b""
+    if len(data) > settings.PARSE_MAX_BYTES:
+        raise ParseLimitExceeded(f"file exceeds {settings.PARSE_MAX_BYTES} bytes")
+    return data
+
+
+def count_pdf_pages(data: bytes) -> int:
+    return min(len(pypdf.PdfReader(BytesIO(data)).pages), settings.PARSE_MAX_PAGES)
+
+
+def iter_pdf_pages(data: bytes, start: int = 0, stop: int | None = None, deadline: float | None = None) -> Iterator[str]:
+    reader = pypdf.PdfReader(BytesIO(data))
+    last = min(len(reader.pages), settings.PARSE_MAX_PAGES)
+    if stop is not None:
+        last = min(last, stop)
+    for i in range(start, last):
+        # Soft wall-clock deadline, checked between pages
+        if deadline is not None and time.time() > deadline:
+            return
+        yield reader.pages[i].extract_text() or ""
+
+
+def iter_docx_paragraphs(data: bytes, deadline: float | None = None) -> Iterator[str]:
+    with zipfile.ZipFile(BytesIO(data)) as zf:
+        with zf.open("word/document.xml") as fh:
+            for _, el in ElementTree.iterparse(fh, events=("end",)):
+                if el.tag != _W_NS + "p":
+                    continue
+                if deadline is not None and time.time() > deadline:
+                    return
+                yield "".join(t.text or "" for t in el.iter(_W_NS + "t"))
+                el.clear()
+
+
+def iter_text(data: bytes, name: str = "", mime: str = "", deadline: float | None = None) -> Iterator[str]:
+    kind = _detect_kind(name, mime, data)
+    if kind == "pdf":
+        yield from iter_pdf_pages(data, deadline=deadline)
+    elif kind == "docx":
+        yield from iter_docx_paragraphs(data, deadline=deadline)
+    else:
+        yield data.decode("utf-8", errors="ignore")
+
+
+def extract_text_from_bytes(data: bytes, name: str = "", mime: str = "") -> str:
+    deadline = time.time() + settings.PARSE_TIMEOUT
+    return "\n".join(iter_text(data, name, mime, deadline=deadline))
+
 
 def extract_text_from_file(uploaded_file) -> str:
     try:
-        if uploaded_file.type == "application/pdf":
-            file_bytes = uploaded_file.read()
-            reader = pypdf.PdfReader(BytesIO(file_bytes))
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text() + "\n"
-            return text
-        else:
-            data = uploaded_file.read()
-            return (data or b"").decode("utf-8", errors="ignore")
+        data = _read_upload(uploaded_file)
+        return extract_text_from_bytes(data, getattr(uploaded_file, "name", ""), getattr(uploaded_file, "type", ""))
     except Exception as e:
-        return f"Error parsing file: {str(e)}"
\ No newline at end of file
+        return f"Error parsing file: {str(e)}"
+
+
+def _parse_pdf_range(data: bytes, start: int, stop: int) -> str:
+    # The time budget starts when a worker picks the task up, not when it is queued
+    deadline = time.time() + settings.PARSE_TIMEOUT
+    return "\n".join(iter_pdf_pages(data, start, stop, deadline=deadline))
+
+
+def _plan_tasks(data: bytes, name: str, mime: str) -> List[tuple]:
+    # Large PDFs are split into page ranges so one document can use several cores
+    if _detect_kind(name, mime, data) == "pdf":
+        pages = count_pdf_pages(data)
+        step = max(1, settings.PARSE_PAGES_PER_TASK)
+        if pages > step:
+            return [(_parse_pdf_range, (data, s, min(s + step, pages))) for s in range(0, pages, step)]
+    return [(extract_text_from_bytes, (data, name, mime))]
+
+
+def iter_extracted(uploaded_files, window: int | None = None) -> Iterator[Dict]:
+    # Parses a batch across the process pool; yields one {"index", "name", "text", "error"}
+    # dict per file, in input order, as soon as that file is done. At most
+    # `window` files (default: twice the worker count) are read and in flight.
+    files = list(uploaded_files)
+    if settings.PARSE_WORKERS == 1 or len(files) <= 1:
+        for i, f in enumerate(files):
+            name = getattr(f, "name", "")
+            try:
+                with metrics.span("ingest.parse"):
+                    text = extract_text_from_bytes(_read_upload(f), name, getattr(f, "type", ""))
+                yield {"index": i, "name": name, "text": text, "error": None}
+            except Exception as e:
+                metrics.incr("ingest.parse_failed")
+                yield {"index": i, "name": name, "text": "", "error": str(e)}
+        return
+
+    window = window or 2 * (settings.PARSE_WORKERS or os.cpu_count() or 1)
+    jobs = deque()
+    queued = iter(enumerate(files))
+
+    def submit(job: Dict):
+        job["pool"] = _get_pool()
+        job["futures"] = [job["pool"].submit(fn, *args) for fn, args in job["tasks"]]
+
+    def submit_next() -> bool:
+        nxt = next(queued, None)
+        if nxt is None:
+            return False
+        i, f = nxt
+        job = {"index": i, "name": getattr(f, "name", ""), "tasks": [], "futures": [], "pool": None, "error": None}
+        try:
+            job["tasks"] = _plan_tasks(_read_upload(f), job["name"], getattr(f, "type", ""))
+            submit(job)
+        except Exception as e:
+            job["error"] = str(e)
+        jobs.append(job)
+        return True
+
+    def result(job: Dict, k: int) -> str:
+        # A task only counts as hung once it has been running for two waits
+        # past the in-worker soft deadline; one merely queued behind other
+        # work keeps waiting. A pool replaced under it means resubmitting; one
+        # that broke by itself (a worker died) is replaced and this file failed.
+        strikes = 0
+        while True:
+            fut = job["futures"][k]
+            try:
+                return fut.result(timeout=settings.PARSE_TIMEOUT + 1.0)
+            except FutureTimeout:
+                if fut.running():
+                    strikes += 1
+                    if strikes >= 2:
+                        raise
+            except (BrokenProcessPool, CancelledError):
+                with _pool_lock:
+                    replaced = job["pool"] is not _pool
+                if not replaced:
+                    _reset_pool(job["pool"])
+                    raise
+                submit(job)
+
+    while len(jobs) < window and submit_next():
+        pass
+
+    while jobs:
+        job = jobs.popleft()
+        submit_next()
+        i, name = job["index"], job["name"]
+        if job["error"]:
+            yield {"index": i, "name": name, "text": "", "error": job["error"]}
+            continue
+        parts = []
+        try:
+            # Time spent waiting on the pool for this document
+            with metrics.span("ingest.parse"):
+                for k in range(len(job["tasks"])):
+                    parts.append(result(job, k))
+            yield {"index": i, "name": name, "text": "\n".join(parts), "error": None}
+        except FutureTimeout:
+            _reset_pool(job["pool"])
+            metrics.incr("ingest.parse_failed", reason="timeout")
+            yield {"index": i, "name": name, "text": "", "error": f"parse timed out after {settings.PARSE_TIMEOUT}s"}
+        except Exception as e:
+            metrics.incr("ingest.parse_failed")
+            yield {"index": i, "name": name, "text": "", "error": str(e) or repr(e)}
@@ -1,188 +1,443 @@
-from typing import List, Dict
+import json
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, Dict
 from ..core.db_client import db
-from .embedder import EmbedderService
+from ..core.doc_store import doc_store
+from ..core.embedding_cache import embedding_cache
+from ..core.vector_mirror import get_mirror
+from ..core.metrics import metrics
+from ..core.resilience import bind_deadline, current_deadline, deadline_scope
+from .embedder import EmbedderService, content_hash, model_key
+from .cache import TTLCache, normalize_text
+from .filters import CompiledFilters, compile_filters
+from .fusion import fuse
+from .matcher import QueryMatcher, compile_matcher
 from ..config import settings
 
-def search_candidates(query: str, strictness: float = 0.5, filters: Dict = None, top_k: int | None = None, fusion_k: float | None = None) -> List[Dict]:
+# Normalized (pre-filter) hybrid results, keyed on the retrieval inputs
+_result_cache = TTLCache(settings.RESULT_CACHE_SIZE, settings.RESULT_CACHE_TTL)
+metrics.register_cache("search_results", _result_cache)
+# Per-leg results for FUSION_MODE=client: the dense leg is keyed on the query
+# (and pushed-down filter), the sparse leg on the augmented keyword text
+_leg_cache = TTLCache(settings.RESULT_CACHE_SIZE * 2, settings.RESULT_CACHE_TTL)
+metrics.register_cache("search_legs", _leg_cache)
+_leg_pool = ThreadPoolExecutor(max_workers=settings.BATCH_SEARCH_CONCURRENCY, thread_name_prefix="search-leg")
+
+_generation = 0
+
+def invalidate_result_cache():
+    # Called by ingestion whenever the collection changes
+    global _generation
+    _generation += 1
+    _result_cache.clear()
+    _leg_cache.clear()
+
+def result_generation() -> int:
+    # Bumped on every ingest; lets callers key their own caches on collection state
+    return _generation
+
+def search_candidates(query: str, strictness: float = 0.5, filters: Dict = None, top_k: int | None = None, fusion_k: float | None = None, dense_vec: list | None = None) -> List[Dict]:
+    # dense_vec lets callers that already embedded the query (batch / API) skip the model
+    return _search(query, strictness, filters, top_k, fusion_k, dense_vec=dense_vec)
+
+
+def search_candidates_batch(queries: List[str], strictness: float = 0.5, filters: Dict | List[Dict] | None = None, top_k: int | None = None, fusion_k: float | None = None) -> List[List[Dict]]:
+    # One model forward pass for every query, then the hybrid searches run
+    # concurrently. `filters` is either shared or one dict per query.
+    if not queries:
+        return []
+    if isinstance(filters, list):
+        if len(filters) != len(queries):
+            raise ValueError("filters must be a single dict or one dict per query")
+        per_query = filters
+    else:
+        per_query = [filters] * len(queries)
+
+    vectors = EmbedderService.encode_queries(queries)
+
+    def run(i: int) -> List[Dict]:
+        try:
+            return _search(queries[i], strictness, per_query[i], top_k, fusion_k, dense_vec=vectors[i])
+        except Exception as e:
+            print(f"🚨 Batch search failed for query #{i}: {e}")
+            return []
+
+    workers = max(1, min(settings.BATCH_SEARCH_CONCURRENCY, len(queries)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run, range(len(queries))))
+
+
+class SearchDeadlineExceeded(Exception):
+    pass
+
+
+def _search(query: str, strictness: float, filters: Dict | None, top_k: int | None, fusion_k: float | None, dense_vec: list | None = None) -> List[Dict]:
+    with metrics.trace("search", query=query[:120]), metrics.span("search.total"):
+        # Embedding (and a cold model load) runs before the clock starts: the
+        # end-to-end deadline (SEARCH_DEADLINE) budgets the Cosdata calls only
+        if dense_vec is None:
+            with metrics.span("search.embed"):
+                dense_vec = EmbedderService.encode_query(query)
+        with deadline_scope(settings.SEARCH_DEADLINE) as deadline:
+            results = _run_search(query, strictness, filters, top_k, fusion_k, dense_vec)
+    metrics.incr("search.requests")
+    if not results and deadline is not None and deadline.missed:
+        # A call was cut off by the deadline; that is not the same as "no matches"
+        metrics.incr("search.deadline_empty")
+        print(f"⚠️ Search deadline ({settings.SEARCH_DEADLINE}s) ran out with no results for: {query[:80]!r}")
+        raise SearchDeadlineExceeded(f"search timed out after {settings.SEARCH_DEADLINE}s")
+    metrics.incr("search.results_returned", len(results))
+    return results
+
+
+def _run_search(query: str, strictness: float, filters: Dict | None, top_k: int | None, fusion_k: float | None, dense_vec: list | None = None) -> List[Dict]:
     # Defaults from config
     if top_k is None:
         top_k = settings.DEFAULT_TOP_K
     if fusion_k is None:
         fusion_k = settings.DEFAULT_FUSION_K
-    # 1. Vector Search (Semantic)
-    dense_vec = EmbedderService.encode(query)
-    
-    # 2. Keyword Search (Constraint Enforcement)
+    # 1. Keyword Search (Constraint Enforcement)
+    augmented_query = augment_query(query, filters)
+
+    compiled = compile_filters(filters)
+    matcher = compile_matcher(query, filters)
+
+    # Over-fetch only when client-side predicates can drop hits, then keep
+    # widening the window until top_k survive or the budget is spent
+    fetch_k = top_k
+    if compiled.can_drop or strictness > 0.7:
+        fetch_k = max(top_k, int(top_k * settings.OVERFETCH_FACTOR))
+    budget = max(fetch_k, settings.OVERFETCH_MAX)
+    # Candidate pool: every search retrieves at least CANDIDATE_POOL_SIZE hits
+    # for its retrieval inputs (query, keyword augmentation, pushed-down
+    # filter). The window lands in the result cache under that depth, so a
+    # later change to only client-side filters, strictness or top_k re-filters
+    # it in memory with no network call and the same ranking.
+    if settings.CANDIDATE_POOL_SIZE:
+        fetch_k = max(fetch_k, settings.CANDIDATE_POOL_SIZE)
+        budget = max(budget, fetch_k)
+    while True:
+        results = _fetch(query, augmented_query, fetch_k, fusion_k, compiled.server, dense_vec)
+        final_results = _apply_filters(results, strictness, compiled, matcher)
+        if len(final_results) >= top_k or len(results) < fetch_k or fetch_k >= budget:
+            break
+        deadline = current_deadline()
+        if deadline is not None and deadline.expired():
+            metrics.incr("search.deadline_exceeded", stage="overfetch")
+            deadline.missed = True
+            break
+        fetch_k = min(fetch_k * 2, budget)
+        metrics.incr("search.overfetch_rounds")
+
+    return _finish(results, final_results, top_k)
+
+
+def iter_matches(query: str, strictness: float = 0.0, filters: Dict | None = None, limit: int = 1000, fusion_k: float | None = None, page: int = 500) -> Iterator[Dict]:
+    # Bulk variant for exports (bypasses the result cache). Cosdata has no
+    # offset, so windows of page, 2*page, 4*page... hits are retrieved without
+    # resume text; each window's not-yet-emitted hits get their text
+    # backfilled and are filtered one page at a time. Only emitted ids are
+    # kept between windows.
+    compiled = compile_filters(filters)
+    matcher = compile_matcher(query, filters)
+    fusion_k = settings.DEFAULT_FUSION_K if fusion_k is None else fusion_k
+    augmented_query = augment_query(query, filters)
+    emitted = set()
+    depth = min(page, limit)
+    while depth > 0:
+        results = _retrieve(query, augmented_query, depth, fusion_k, compiled.server, raw_text=False)
+        fresh = [r for r in results if r["id"] not in emitted]
+        for start in range(0, len(fresh), page):
+            chunk = fresh[start:start + page]
+            emitted.update(r["id"] for r in chunk)
+            yield from _apply_filters(_backfill(chunk), strictness, compiled, matcher)
+        # A short window means the whole match set has been seen
+        if len(results) < depth or depth >= limit:
+            return
+        depth = min(depth * 2, limit)
+
+
+def iter_filtered(docs: Iterable[Dict], strictness: float = 0.0, filters: Dict | None = None, query: str = "", chunk: int = 1000) -> Iterator[Dict]:
+    # Applies the search filters to an arbitrary document stream, chunk by chunk
+    compiled = compile_filters(filters, pushdown=False)
+    matcher = compile_matcher(query, filters)
+    docs = iter(docs)
+    while True:
+        page = list(islice(docs, chunk))
+        if not page:
+            return
+        yield from _apply_filters(page, strictness, compiled, matcher)
+
+
+def augment_query(query: str, filters: Dict | None) -> str:
     augmented_query = query
     if filters:
         if filters.get("visa"): augmented_query += " " + filters["visa"]
         if filters.get("clearance"): augmented_query += " " + filters["clearance"]
         if filters.get("must"):
             augmented_query += " " + " ".join(filters["must"])
+    return augmented_query
 
-    # 3. Execute Hybrid Search
-    raw_results = db.manual_hybrid_search(dense_vec, augmented_query, top_k=top_k, fusion_k=fusion_k)
-
-    def normalize(r: Dict) -> Dict:
-        # Some servers nest payload under keys like 'vector', 'item', or 'data'
-        container = r
-        for k in ("vector", "item", "data"):
-            if isinstance(r.get(k), dict):
-                container = r.get(k)
-                break
-        meta = r.get("metadata") or container.get("metadata") or r.get("meta") or {}
-        text = (
-            r.get("text")
-            or r.get("raw_text")
-            or r.get("document")
-            or container.get("text")
-            or container.get("raw_text")
-            or container.get("document")
-            or ""
-        )
-        rid = (
-            r.get("id")
-            or container.get("id")
-            or meta.get("id")
-            or meta.get("doc_id")
-            or f"doc-{abs(hash(text))%10_000_000}"
-        )
-        score = r.get("score") or container.get("score") or r.get("similarity") or 0
-        return {**r, "metadata": meta, "text": text, "id": rid, "score": score}
-
-    results = [normalize(r) for r in (raw_results or [])]
-
-    # Fallback to text search if hybrid returned nothing
-    if not results:
-        try:
-            col = db.get_collection()
-            tfidf_resp = col.search.text(augmented_query, top_k=top_k, return_raw_text=True)
-            maybe_list = tfidf_resp.get("results") if isinstance(tfidf_resp, dict) else tfidf_resp
-            results = [normalize(r) for r in (maybe_list or [])]
-        except Exception:
-            results = []
-
-    # Enrich missing text by fetching vector by id
-    try:
-        if results:
-            col = db.get_collection()
-            for r in results:
-                if not r.get("text") and r.get("id"):
-                    try:
-                        vec = col.vectors.get(r["id"])
-                        if getattr(vec, "text", None):
-                            r["text"] = vec.text
-                    except Exception:
-                        pass
-            # As a secondary fallback, try a TF-IDF search and backfill text by id
-            if any(not (x.get("text") or "") for x in results):
-                try:
-                    tfidf_resp2 = col.search.text(augmented_query, top_k=max(top_k, 50), return_raw_text=True)
-                    tfidf_list = tfidf_resp2.get("results") if isinstance(tfidf_resp2, dict) else tfidf_resp2
-                    tfidf_map = {}
-                    for item in tfidf_list or []:
-                        _id = item.get("id") or (item.get("vector") or {}).get("id")
-                        _text = item.get("text") or item.get("raw_text") or (item.get("vector") or {}).get("text")
-                        if _id and _text:
-                            tfidf_map[_id] = _text
-                    for r in results:
-                        if not r.get("text") and r.get("id") in tfidf_map:
-                            r["text"] = tfidf_map[r["id"]]
-                except Exception:
-                    pass
-    except Exception:
-        pass
-
-    final_results = []
-    for r in results:
-        meta = r.get("metadata", {})
-        text = r.get("text", "")
-
-        # --- HARD FILTER LOGIC ---
-        if filters:
-            if filters.get("visa"):
-                visa_val = str(meta.get("visa", "")).lower()
-                if (filters["visa"].lower() not in visa_val) and (filters["visa"].lower() not in text.lower()):
-                    continue
-            if filters.get("clearance"):
-                clear_val = str(meta.get("clearance", "")).lower()
-                if (filters["clearance"].lower() not in clear_val) and (filters["clearance"].lower() not in text.lower()):
-                    continue
-            # Experience filter (metadata 'exp')
-            if filters.get("min_exp") is not None:
-                try:
-                    exp_val = meta.get("exp")
-                    if exp_val is None:
-                        raise ValueError
-                    if int(exp_val) < int(filters["min_exp"]):
-                        continue
-                except Exception:
-                    # If exp missing or unparsable, treat as failing the min_exp requirement
-                    continue
-            # Role/location contains
-            if filters.get("role_contains") and filters["role_contains"].lower() not in str(meta.get("role", "")).lower():
-                continue
-            if filters.get("location_contains") and filters["location_contains"].lower() not in str(meta.get("location", "")).lower():
-                continue
-            # Must and exclude keyword constraints on text
-            if filters.get("must"):
-                lower_text = text.lower()
-                if any(kw.lower() not in lower_text for kw in filters["must"]):
-                    continue
-            if filters.get("exclude"):
-                lower_text = text.lower()
-                if any(kw.lower() in lower_text for kw in filters["exclude"]):
-                    continue
-
-        # --- STRICTNESS LOGIC ---
-        if strictness > 0.7:
-            key_terms = [w.strip(".,") for w in query.split() if len(w) > 2]
-            missing = [t for t in key_terms if t.lower() not in text.lower()]
-            if missing:
-                continue
-
-        # --- MATCH EXPLANATION ---
-        skills_found = []
-        common_skills = ["python", "java", "aws", "kubernetes", "react", "pmp", "mba", "terraform", "pytorch"]
-        for skill in common_skills:
-            if skill in query.lower() and skill in text.lower():
-                skills_found.append(skill.capitalize())
-
-        # --- SCORE THRESHOLD ---
-        if filters and filters.get("min_score") is not None:
-            try:
-                if float(r.get("score") or 0.0) < float(filters["min_score"]):
-                    continue
-            except Exception:
-                pass
-
-        r["match_explanation"] = f"Matched on {', '.join(skills_found)}" if skills_found else "Semantic/Text Match"
-        final_results.append(r)
 
+def _finish(results: List[Dict], final_results: List[Dict], top_k: int) -> List[Dict]:
     # If everything was filtered out, optionally relax constraints (env flag)
     if not final_results and settings.RELAX_ON_EMPTY:
-        try:
-            # Prefer whatever we already have, sorted by score desc
+        # Reuse the widest window we already fetched, sorted by score desc
+        with metrics.span("search.relax"):
             relaxed = sorted(results, key=lambda x: float(x.get("score") or 0), reverse=True)[:top_k]
             for r in relaxed:
                 r.setdefault("match_explanation", "Relaxed match (filters too strict)")
-            if relaxed:
-                return relaxed
-        except Exception:
-            pass
+        metrics.incr("search.relaxed")
+        return relaxed
 
-        # Last resort: plain text search on original query (no augmented filters)
+    return final_results[:top_k]
+
+
+def _fetch(query: str, augmented_query: str, top_k: int, fusion_k: float, metadata_filter: Dict | None = None, dense_vec: list | None = None) -> List[Dict]:
+    cache_key = (
+        normalize_text(query),
+        normalize_text(augmented_query),
+        int(top_k),
+        float(fusion_k),
+        json.dumps(metadata_filter, sort_keys=True) if metadata_filter else None,
+    )
+    cached = _result_cache.get(cache_key)
+    if cached is not None:
+        return [dict(r) for r in cached]
+    results = _retrieve(query, augmented_query, top_k, fusion_k, metadata_filter, dense_vec)
+    # Degraded (mirror) or partial (one leg failed) results must not outlive the outage
+    if results and not (results[0].get("degraded") or results[0].get("partial")):
+        _result_cache.set(cache_key, [dict(r) for r in results])
+        return results
+    if not db.available:
+        # While Cosdata is unreachable an expired entry beats a degraded one
+        stale = _result_cache.get_stale(cache_key)
+        if stale is not None:
+            metrics.incr("search.stale_served")
+            return [{**r, "stale": True} for r in stale]
+    return results
+
+
+def normalize(r: Dict) -> Dict:
+    # Some servers nest payload under keys like 'vector', 'item', or 'data'
+    container = r
+    for k in ("vector", "item", "data"):
+        if isinstance(r.get(k), dict):
+            container = r.get(k)
+            break
+    meta = r.get("metadata") or container.get("metadata") or r.get("meta") or {}
+    text = (
+        r.get("text")
+        or r.get("raw_text")
+        or r.get("document")
+        or container.get("text")
+        or container.get("raw_text")
+        or container.get("document")
+        or ""
+    )
+    rid = (
+        r.get("id")
+        or container.get("id")
+        or meta.get("id")
+        or meta.get("doc_id")
+        or f"doc-{abs(hash(text))%10_000_000}"
+    )
+    score = r.get("score") or container.get("score") or r.get("similarity") or 0
+    return {**r, "metadata": meta, "text": text, "id": rid, "score": score}
+
+
+def _retrieve(query: str, augmented_query: str, top_k: int, fusion_k: float, metadata_filter: Dict | None = None, dense_vec: list | None = None, raw_text: bool = True) -> List[Dict]:
+    # raw_text=False asks Cosdata for ids, scores and metadata only (exports
+    # backfill text page by page instead)
+    # 2. Vector Search (Semantic), embedded only when something needs the vector
+    def query_vector() -> list:
+        nonlocal dense_vec
+        if dense_vec is None:
+            with metrics.span("search.embed"):
+                dense_vec = EmbedderService.encode_query(query)
+        return dense_vec
+
+    client_fusion = settings.FUSION_MODE == "client"
+    if client_fusion:
+        results = _client_fused(query, augmented_query, top_k, fusion_k, metadata_filter, query_vector, raw_text)
+    else:
+        # 3. Execute Hybrid Search
+        vec = query_vector()
+        with metrics.span("search.hybrid"):
+            raw_results = db.manual_hybrid_search(vec, augmented_query, top_k=top_k, fusion_k=fusion_k, metadata_filter=metadata_filter, raw_text=raw_text)
+        results = [normalize(r) for r in (raw_results or [])]
+    mirror = get_mirror()
+
+    if not results and mirror is not None and not db.available:
+        # Cosdata is down: serve read-only dense results from the local mirror
+        metrics.incr("search.degraded")
+        vec = query_vector()
+        with metrics.span("search.mirror"):
+            hits = mirror.search(vec, top_k)
+            docs = doc_store.get_many([vid for vid, _ in hits])
+        results = [
+            {"id": vid, "score": score, "text": docs.get(vid, {}).get("text", ""), "metadata": docs.get(vid, {}).get("metadata", {}), "degraded": True}
+            for vid, score in hits
+        ]
+    elif results and mirror is not None and settings.RERANK_DENSE_WEIGHT > 0:
+        vec = query_vector()
+        with metrics.span("search.rerank"):
+            _rerank(results, _dense_scores(mirror, vec, results))
+
+    # Fallback to text search if hybrid returned nothing (client fusion already ran it)
+    if not results and db.available and not client_fusion:
+        metrics.incr("search.fallback_text")
+        with metrics.span("search.fallback_text"):
+            results = [normalize(r) for r in (db.text_search(augmented_query, top_k=top_k, raw_text=raw_text) or [])]
+
+    if raw_text:
+        _backfill(results)
+    return results
+
+
+def _backfill(results: List[Dict]) -> List[Dict]:
+    # Missing text in one local lookup (plus one concurrent fetch for misses)
+    missing = [r["id"] for r in results if not r.get("text") and r.get("id")]
+    if missing:
+        metrics.incr("search.backfilled", len(missing))
         try:
-            col = db.get_collection()
-            tfidf_resp = col.search.text(query, top_k=top_k, return_raw_text=True)
-            maybe_list = tfidf_resp.get("results") if isinstance(tfidf_resp, dict) else tfidf_resp
-            relaxed2 = [normalize(r) for r in (maybe_list or [])]
-            for r in relaxed2:
-                r.setdefault("match_explanation", "Text match (no filters)")
-            return relaxed2
+            with metrics.span("search.backfill"):
+                docs = db.fetch_documents(missing)
         except Exception:
-            return []
+            metrics.incr("errors", stage="backfill")
+            docs = {}
+        for r in results:
+            doc = docs.get(r.get("id"))
+            if doc and not r.get("text"):
+                r["text"] = doc["text"]
+                if not r.get("metadata"):
+                    r["metadata"] = doc["metadata"]
+    return results
+
+
+def _leg_get(key: tuple, top_k: int) -> List[Dict] | None:
+    # A leg fetched at depth >= top_k (or one that came back short, i.e.
+    # complete) serves any shallower request
+    entry = _leg_cache.get(key)
+    if entry is None:
+        return None
+    depth, results = entry
+    if depth < top_k and len(results) >= depth:
+        return None
+    return results[:top_k]
+
+
+def _leg_put(key: tuple, top_k: int, raw: List[Dict] | None) -> List[Dict] | None:
+    if raw is None:
+        return None
+    results = [normalize(r) for r in raw]
+    # A leg gathered while a shard was down is used once, not remembered
+    if not any(r.get("partial") for r in results):
+        _leg_cache.set(key, (top_k, results))
+    return results
+
+
+def _client_fused(query: str, augmented_query: str, top_k: int, fusion_k: float, metadata_filter: Dict | None, query_vector, raw_text: bool = True) -> List[Dict]:
+    # Dense and TF-IDF legs are cached on their own inputs, so a new fusion_k
+    # reuses both and a new keyword (visa / clearance / must) re-runs only
+    # the sparse leg. Missing legs are fetched concurrently.
+    dense_key = ("dense", normalize_text(query), json.dumps(metadata_filter, sort_keys=True) if metadata_filter else None)
+    sparse_key = ("sparse", normalize_text(augmented_query))
+    if not raw_text:
+        dense_key, sparse_key = dense_key + ("ids",), sparse_key + ("ids",)
+    dense = _leg_get(dense_key, top_k)
+    sparse = _leg_get(sparse_key, top_k)
+    metrics.incr("search.leg_cache", (dense is not None) + (sparse is not None), result="reused")
+
+    def run_dense():
+        vec = query_vector()
+        with metrics.span("search.dense"):
+            return db.dense_search(vec, top_k=top_k, metadata_filter=metadata_filter, raw_text=raw_text)
+
+    def run_sparse():
+        with metrics.span("search.sparse"):
+            return db.text_search(augmented_query, top_k=top_k, share=settings.SEARCH_HYBRID_SHARE, raw_text=raw_text)
+
+    pending = _leg_pool.submit(bind_deadline(run_dense)) if dense is None else None
+    if sparse is None:
+        sparse = _leg_put(sparse_key, top_k, run_sparse())
+    if pending is not None:
+        dense = _leg_put(dense_key, top_k, pending.result())
+
+    legs = {"dense": [dict(r) for r in dense or []], "sparse": [dict(r) for r in sparse or []]}
+    w = settings.FUSION_DENSE_WEIGHT
+    weights = (w, 1.0 - w) if settings.FUSION_METHOD == "weighted" else (1.0, 1.0)
+    with metrics.span("search.fuse"):
+        results = fuse(legs, settings.FUSION_METHOD, k=fusion_k, weights=weights, top_k=top_k)
+    if dense is None or sparse is None:
+        for r in results:
+            r["partial"] = True
+    return results
+
+
+def _dense_scores(mirror, vec, results: List[Dict]) -> Dict[str, float]:
+    dense = mirror.rescore(vec, [r["id"] for r in results])
+    missing = [r for r in results if r["id"] not in dense and r.get("text")]
+    if missing:
+        # Indexed before the mirror was enabled: the ingest-time embedding is
+        # usually still in the persistent cache, so it is mirrored now
+        hashes = [content_hash(r["text"]) for r in missing]
+        cached = embedding_cache.get_many(hashes, model_key())
+        found = [{"id": r["id"], "dense_values": cached[h]} for r, h in zip(missing, hashes) if h in cached]
+        if found:
+            mirror.put_many(found)
+            dense.update(mirror.rescore(vec, [f["id"] for f in found]))
+            metrics.incr("search.mirror_filled", len(found))
+    return dense
+
+
+def _rerank(results: List[Dict], dense: Dict[str, float]):
+    # Blend the server's fused score (scaled to [0, 1]) with exact cosine.
+    # Every hit needs a cosine for the blended scores to be comparable, so a
+    # list with any hit still missing from the mirror keeps the server order.
+    if any(r["id"] not in dense for r in results):
+        metrics.incr("search.rerank_skipped")
+        return
+    w = settings.RERANK_DENSE_WEIGHT
+    top = max(float(r.get("score") or 0) for r in results) or 1.0
+    for r in results:
+        r["fused_score"] = r.get("score")
+        r["dense_score"] = dense[r["id"]]
+        r["score"] = (1 - w) * float(r.get("score") or 0) / top + w * dense[r["id"]]
+    results.sort(key=lambda r: float(r.get("score") or 0), reverse=True)
+
+
+def _apply_filters(results: List[Dict], strictness: float, compiled: CompiledFilters, matcher: QueryMatcher) -> List[Dict]:
+    with metrics.span("search.filter"):
+        final_results = []
+        dropped = {}
+        for r in results:
+            text = r.get("text", "")
+
+            # Drop unusable items (must have id and text)
+            if not r.get("id") or not (text or "").strip():
+                dropped["missing_text"] = dropped.get("missing_text", 0) + 1
+                continue
+
+            # --- HARD FILTER LOGIC ---
+            reason = compiled.failure(r)
+            if reason is None:
+                # --- MUST / EXCLUDE / STRICTNESS (one pass over the text) ---
+                hits = matcher.scan(text)
+                doc_bits = matcher.doc_bits(r.get("metadata"))
+                reason = matcher.failure(hits, strict=strictness > 0.7, doc_bits=doc_bits)
+            if reason is not None:
+                dropped[reason] = dropped.get(reason, 0) + 1
+                continue
+
+            # --- MATCH EXPLANATION (skill bitset intersection) ---
+            skills_found = matcher.skills_found(hits, doc_bits)
+
+            r["match_explanation"] = f"Matched on {', '.join(skills_found)}" if skills_found else "Semantic/Text Match"
+            r["highlights"] = matcher.highlights(hits)
+            final_results.append(r)
 
-    # Drop unusable items (must have id and text)
-    clean = [r for r in final_results if r.get("id") and (r.get("text") or "").strip()]
-    return clean[:top_k]
\ No newline at end of file
+    for reason, count in dropped.items():
+        metrics.incr("search.filter_dropped", count, reason=reason)
+    return final_results
@@ -0,0 +1,120 @@
+import json
+import os
+import re
+import threading
+from typing import Dict, Iterable, List
+from ..config import settings
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "skills.json")
+
+
+class SkillTaxonomy:
+    # Canonical skills plus synonyms, matched in one regex pass. A skill's id
+    # is its position in the file, so documents can store the skills they
+    # mention as a bitset (hex string in metadata, tagged with the taxonomy
+    # version) and queries resolve to a bitset once instead of scanning text.
+    # Append new skills at the end and bump "version" on any reordering.
+    def __init__(self, data: Dict):
+        self.version = str(data.get("version") or "1")
+        self.names: List[str] = []
+        self._alias_to_id: Dict[str, int] = {}
+        folded, exact = [], []
+        for sid, entry in enumerate(data.get("skills") or []):
+            self.names.append(entry["name"])
+            for alias in [entry["name"], *(entry.get("aliases") or [])]:
+                # "match_case" protects short names that are also ordinary words ("Go")
+                case = bool(entry.get("match_case")) and alias == entry["name"]
+                self._alias_to_id.setdefault(alias if case else alias.lower(), sid)
+                (exact if case else folded).append(alias)
+        self._folded = self._compile(folded, re.IGNORECASE)
+        self._exact = self._compile(exact, 0)
+
+    @staticmethod
+    def _compile(aliases: List[str], flags: int):
+        if not aliases:
+            return None
+        # Longest first so "React Native" wins over "React"; boundaries are
+        # alphanumeric-only so "C++", "CI/CD" and ".NET" still match
+        alts = "|".join(re.escape(a) for a in sorted(set(aliases), key=len, reverse=True))
+        return re.compile(r"(?<![A-Za-z0-9])(" + alts + r")(?![A-Za-z0-9])", flags)
+
+    def __len__(self):
+        return len(self.names)
+
+    def lookup(self, term: str) -> int | None:
+        # Exact alias lookup (no scanning): "k8s" -> id of Kubernetes
+        term = (term or "").strip()
+        sid = self._alias_to_id.get(term)
+        return sid if sid is not None else self._alias_to_id.get(term.lower())
+
+    def find_ids(self, text: str) -> List[int]:
+        found = set()
+        for pattern in (self._folded, self._exact):
+            if pattern is not None and text:
+                for m in pattern.finditer(text):
+                    sid = self.lookup(m.group(1))
+                    if sid is not None:
+                        found.add(sid)
+        return sorted(found)
+
+    def ids_for_names(self, names: Iterable[str]) -> List[int]:
+        return sorted({sid for sid in (self.lookup(n) for n in names) if sid is not None})
+
+    @staticmethod
+    def to_bits(ids: Iterable[int]) -> int:
+        bits = 0
+        for sid in ids:
+            bits |= 1 << sid
+        return bits
+
+    def names_for_bits(self, bits: int) -> List[str]:
+        out = []
+        sid = 0
+        while bits:
+            if bits & 1:
+                out.append(self.names[sid])
+            bits >>= 1
+            sid += 1
+        return out
+
+    def doc_bits(self, meta: Dict) -> int | None:
+        # The document's skill bitset, or None if it was indexed under another
+        # taxonomy version (callers then fall back to text matching)
+        raw = (meta or {}).get("skill_bits")
+        if raw is None or str((meta or {}).get("skill_tax")) != self.version:
+            return None
+        try:
+            return int(raw, 16)
+        except (TypeError, ValueError):
+            return None
+
+    def annotate(self, meta: Dict, text: str = "") -> Dict:
+        # Canonical skill names + bitset from the text and any listed skills
+        listed = meta.get("skills") or []
+        if isinstance(listed, str):
+            listed = listed.split(",")
+        listed = [s.strip() for s in listed if s and s.strip()]
+        ids = set(self.find_ids(text)) | set(self.ids_for_names(listed))
+        known = {self.names[i].lower() for i in ids}
+        extra = [s for s in listed if self.lookup(s) is None and s.lower() not in known]
+        return {
+            **meta,
+            "skills": [self.names[i] for i in sorted(ids)] + extra,
+            "skill_bits": format(self.to_bits(ids), "x"),
+            "skill_tax": self.version,
+        }
+
+
+_taxonomy = None
+_taxonomy_lock = threading.Lock()
+
+
+def get_taxonomy() -> SkillTaxonomy:
+    global _taxonomy
+    if _taxonomy is None:
+        with _taxonomy_lock:
+            if _taxonomy is None:
+                path = settings.SKILL_TAXONOMY_PATH or DEFAULT_TAXONOMY_PATH
+                with open(path, encoding="utf-8") as f:
+                    _taxonomy = SkillTaxonomy(json.load(f))
+    return _taxonomy
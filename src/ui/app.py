@@ -1,13 +1,17 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import time
+import csv
+import io
 import json
 
-from ..services.search import search_candidates
-from ..services.parser import extract_text_from_file
+from ..services.search import SearchDeadlineExceeded, result_generation, search_candidates
 from ..services.embedder import EmbedderService
+from ..services.ingest import ingest_documents
+from ..services.ingest_jobs import cancel_job, start_ingest_job
+from ..core.analytics import analytics
 from ..core.db_client import db
+from ..core.job_store import job_store
+from ..core.metrics import metrics
+from ..config import settings
 
 st.set_page_config(page_title="Kosdra HR", layout="wide", page_icon="🦁")
 
@@ -23,6 +27,170 @@ def toggle_shortlist(candidate):
         st.session_state.shortlist.append(candidate)
         st.toast(f"Shortlisted {candidate['name']}")
 
+def highlight_snippet(text, spans, limit=200):
+    # Spans come from the search matcher, so no re-scanning of the text here
+    out, pos = [], 0
+    for start, end in spans:
+        if start >= limit:
+            break
+        end = min(end, limit)
+        out.append(text[pos:start])
+        out.append(f"<mark>{text[start:end]}</mark>")
+        pos = end
+    out.append(text[pos:limit])
+    return "".join(out)
+
+def results_csv(results):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(["id", "name", "role", "location", "visa", "exp", "score"])
+    for x in results:
+        meta = x.get("metadata") or {}
+        writer.writerow([x.get("id"), meta.get("name"), meta.get("role"), meta.get("location"), meta.get("visa"), meta.get("exp"), x.get("score")])
+    return buf.getvalue().encode("utf-8")
+
+def get_cached_search(key):
+    return st.session_state.setdefault("search_cache", {}).get(key) if key else None
+
+def put_cached_search(key, results):
+    # Small per-session LRU of result sets keyed on every search input
+    cache = st.session_state.setdefault("search_cache", {})
+    cache.pop(key, None)
+    cache[key] = {"key": key, "results": results, "cards": {}}
+    while len(cache) > settings.UI_SEARCH_CACHE_SIZE:
+        cache.pop(next(iter(cache)))
+    return cache[key]
+
+def job_progress_text(job):
+    return (
+        f"Parsed {job['parsed']}/{job['total']} · embedded {job['embedded']} · indexed {job['indexed']}"
+        + (f" · {job['skipped']} already indexed" if job["skipped"] else "")
+        + (f" · {job['failed']} failed" if job["failed"] else "")
+    )
+
+def render_job_errors(job):
+    if job["errors"]:
+        with st.expander(f"⚠️ {job['failed']} file(s) skipped"):
+            for err in job["errors"]:
+                st.write(f"**{err['name']}**: {err['error']}")
+
+@st.fragment(run_every=settings.INGEST_JOB_POLL_INTERVAL)
+def render_job_progress(job_id):
+    # Re-runs on its own every poll interval without re-running the page
+    job = job_store.get(job_id)
+    if job is None:
+        return
+    if job["status"] not in ("queued", "running"):
+        # Full rerun so the summary and the dashboard pick up the new counts
+        st.rerun()
+    done = job["indexed"] + job["skipped"] + job["failed"]
+    st.progress(min(1.0, done / max(1, job["total"])), text=job_progress_text(job))
+    render_job_errors(job)
+    if st.button("Cancel Import", key=f"cancel_{job_id}"):
+        cancel_job(job_id)
+
+def render_job_summary(job):
+    if job["status"] == "completed":
+        st.success(f"✅ {job['message']}")
+    elif job["status"] == "cancelled":
+        st.warning(f"Import cancelled. {job_progress_text(job)}")
+    else:
+        st.error(f"Import {job['status']}: {job['message'] or job_progress_text(job)}")
+    render_job_errors(job)
+
+def card_html(r):
+    meta = r.get("metadata") or {}
+    # Clamp score to 0..1 for percentage display
+    try:
+        _raw_score = float(r.get('score') or 0)
+        _clamped = max(0.0, min(1.0, _raw_score))
+    except Exception:
+        _clamped = 0.0
+    score_pct = int(_clamped * 100)
+
+    # Safe display values
+    disp_name = meta.get('name') or 'Candidate'
+    disp_role = meta.get('role') or 'Applicant'
+    disp_loc = meta.get('location') or 'Unknown'
+    disp_visa = meta.get('visa') or 'Unknown'
+    disp_exp = meta.get('exp', 'Unknown')
+
+    match_reason = r.get("match_explanation", "Semantic Match")
+
+    snippet = highlight_snippet(r.get('text') or '', r.get('highlights') or [])
+    if not snippet:
+        snippet = "No preview available"
+
+    return f"""
+    <div class="candidate-card">
+        <div style="display:flex; justify-content:space-between; align-items:center;">
+            <div>
+                <h3 style="margin:0; color:#FFF;">{disp_name}</h3>
+                <span style="color:#AAA; font-size:0.9rem;">{disp_role}</span>
+            </div>
+            <div style="text-align:right;">
+                <span style="font-size:1.5rem; font-weight:800; color:#FFD700;">{score_pct}%</span>
+            </div>
+        </div>
+        <div style="margin:10px 0;">
+            <span class="tag">📍 {disp_loc}</span>
+            <span class="tag">🛂 {disp_visa}</span>
+            <span class="tag">💡 {disp_exp} Yrs Exp</span>
+        </div>
+        <p style=\"color:#CCC; font-size:0.95rem;\">{snippet}...</p>
+        <div class="match-reason">ℹ️ {match_reason}</div>
+    </div>
+    """
+
+def render_results(entry):
+    results = entry["results"]
+    if not results:
+        st.warning("No candidates match your specific criteria.")
+        return
+    st.success(f"Found {len(results)} qualified candidates")
+    if results[0].get("degraded"):
+        st.info("⚠️ Vector DB unreachable: showing semantic-only results from the local mirror.")
+    elif results[0].get("stale"):
+        st.info("⚠️ Vector DB unreachable: showing the last results cached for this search.")
+
+    # Only the current page is rendered; card HTML is built once per result
+    size = max(1, settings.UI_PAGE_SIZE)
+    pages = (len(results) + size - 1) // size
+    page = min(st.session_state.get("results_page", 0), pages - 1)
+    shortlisted = {c['id'] for c in st.session_state.get('shortlist', [])}
+    for r in results[page * size:(page + 1) * size]:
+        rid = r.get("id")
+        if rid not in entry["cards"]:
+            entry["cards"][rid] = card_html(r)
+        st.markdown(entry["cards"][rid], unsafe_allow_html=True)
+
+        disp_name = (r.get("metadata") or {}).get('name') or 'Candidate'
+        c1, c2 = st.columns([1, 5])
+        with c1:
+            btn_label = "➖ Remove" if rid in shortlisted else "➕ Shortlist"
+            if st.button(btn_label, key=f"sl_{rid}"):
+                toggle_shortlist({"name": disp_name, "id": rid})
+                st.rerun()
+        with c2:
+            # The JSON payload is only serialized for the card that asked for it
+            if st.session_state.get("json_ready") == rid:
+                st.download_button("📄 Download JSON", data=json.dumps(r, indent=2), file_name=f"{disp_name}.json", key=f"dl_{rid or 'unknown'}")
+            elif st.button("📄 Prepare JSON", key=f"prep_{rid or 'unknown'}"):
+                st.session_state["json_ready"] = rid
+                st.rerun()
+
+    if pages > 1:
+        p1, p2, p3 = st.columns([1, 2, 1])
+        with p1:
+            if st.button("◀ Prev", disabled=page == 0, key="page_prev"):
+                st.session_state["results_page"] = page - 1
+                st.rerun()
+        p2.markdown(f"<div style='text-align:center;'>Page {page + 1} of {pages}</div>", unsafe_allow_html=True)
+        with p3:
+            if st.button("Next ▶", disabled=page >= pages - 1, key="page_next"):
+                st.session_state["results_page"] = page + 1
+                st.rerun()
+
 st.markdown("""
 <style>
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;600;700&display=swap');
@@ -37,12 +205,40 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource(show_spinner=False)
+def shared_resources():
+    # Process-wide, shared by every session: the model loads and the DB
+    # connects once, on background threads, while the first page renders.
+    if settings.WARMUP_ON_START:
+        EmbedderService.warm_up(background=True)
+        db.warm_up(background=True)
+    return db
+
+def render_debug_panel():
+    import pandas as pd
+    with st.expander("🔧 Debug: pipeline timings & metrics"):
+        trace = metrics.last_trace("search")
+        if trace:
+            st.caption(f"Last search: {trace.get('query', '')!r} — {trace['total_ms']:.1f} ms")
+            st.dataframe(pd.DataFrame(trace["spans"], columns=["stage", "ms"]), use_container_width=True)
+        snap = metrics.snapshot()
+        if snap["timers"]:
+            st.dataframe(pd.DataFrame.from_dict(snap["timers"], orient="index"), use_container_width=True)
+        st.json({"counters": snap["counters"], "caches": snap["caches"]})
+
 def render_app():
+    shared_resources()
+    # Heavy UI deps are imported only after warm-up has been kicked off
+    import pandas as pd
+    import plotly.express as px
+
     if 'shortlist' not in st.session_state:
         st.session_state['shortlist'] = []
     with st.sidebar:
         st.title("🦁 Kosdra")
         st.caption("Intelligent Recruitment OS")
+        if not EmbedderService.is_ready():
+            st.caption("⏳ Warming up the search model…")
         st.divider()
         
         st.header("Filters Panel")
@@ -94,26 +290,38 @@ def render_app():
 
     with t_dash:
         st.markdown("### Recruitment Overview")
+        # Precomputed at ingest time; no Cosdata round trip on rerun
+        pool = analytics.snapshot()
         c1, c2, c3, c4 = st.columns(4)
-        c1.metric("Active Candidates", "1,240", "+12%")
+        c1.metric("Active Candidates", f"{pool.get('total', {}).get('candidates', 0):,}")
         c2.metric("Interviews", "45", "+5")
         c3.metric("Offers Sent", "12", "2 pending")
         c4.metric("Time to Hire", "18 Days", "-2 Days")
         st.markdown("---")
-        
-        df = pd.DataFrame({
-            "Skill": ["Python", "Kubernetes", "React", "AWS", "Java", "Go"],
-            "Candidates": [450, 320, 280, 310, 150, 90]
-        })
-        fig = px.bar(
-            df,
-            x="Skill",
-            y="Candidates",
-            title="Talent Pool by Skill",
-            color="Candidates",
-            color_continuous_scale="sunset"
-        )
-        st.plotly_chart(fig, use_container_width=True)
+
+        skills = list(pool.get("skill", {}).items())[:12]
+        if not skills:
+            st.info("No candidates indexed yet. Import resumes to populate the dashboard.")
+        else:
+            df = pd.DataFrame(skills, columns=["Skill", "Candidates"])
+            fig = px.bar(
+                df,
+                x="Skill",
+                y="Candidates",
+                title="Talent Pool by Skill",
+                color="Candidates",
+                color_continuous_scale="sunset"
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
+            d1, d2, d3 = st.columns(3)
+            for col_, dim, title in ((d1, "location", "By Location"), (d2, "visa", "By Visa Status"), (d3, "experience", "By Experience")):
+                counts = list(pool.get(dim, {}).items())[:10]
+                if counts:
+                    col_.plotly_chart(
+                        px.bar(pd.DataFrame(counts, columns=["Value", "Candidates"]), x="Value", y="Candidates", title=title),
+                        use_container_width=True,
+                    )
 
     with t_search:
         c_search, c_short = st.columns([3, 1])
@@ -122,87 +330,38 @@ def render_app():
                                placeholder="e.g. Senior Python Engineer with PMP certification...",
                                value="Senior Python Engineer with PMP certification")
             
+            search_key = json.dumps(
+                [" ".join(query.split()), strictness, filters, results_count, float(fusion_balance), result_generation()],
+                sort_keys=True,
+            )
             if st.button("Find Candidates", type="primary"):
-                with st.spinner("Running Hybrid Search..."):
-                    results = search_candidates(
-                        query,
-                        strictness,
-                        filters,
-                        top_k=results_count,
-                        fusion_k=float(fusion_balance),
-                    )
-                
-                if not results:
-                    st.warning("No candidates match your specific criteria.")
-                else:
-                    st.success(f"Found {len(results)} qualified candidates")
-                    st.session_state['last_results'] = results
-                    for r in results:
-                        meta = r.get("metadata") or {}
-                        # Clamp score to 0..1 for percentage display
-                        try:
-                            _raw_score = float(r.get('score') or 0)
-                            _clamped = max(0.0, min(1.0, _raw_score))
-                        except Exception:
-                            _clamped = 0.0
-                        score_pct = int(_clamped * 100)
-
-                        # Safe display values
-                        disp_name = meta.get('name') or 'Candidate'
-                        disp_role = meta.get('role') or 'Applicant'
-                        disp_loc = meta.get('location') or 'Unknown'
-                        disp_visa = meta.get('visa') or 'Unknown'
-                        disp_exp = meta.get('exp', 'Unknown')
-
-                        is_shortlisted = any(c['id'] == r.get('id') for c in st.session_state.get('shortlist', []))
-                        btn_label = "➖ Remove" if is_shortlisted else "➕ Shortlist"
-                        
-                        match_reason = r.get("match_explanation", "Semantic Match")
-
-                        snippet = (r.get('text') or '')[:200]
-                        if not snippet:
-                            snippet = "No preview available"
-                        hl_terms = set()
-                        if filters.get('must'):
-                            hl_terms.update([t for t in filters['must']])
-                        for t in query.split():
-                            if len(t) > 3:
-                                hl_terms.add(t)
-                        for t in sorted(hl_terms, key=len, reverse=True):
-                            try:
-                                snippet = snippet.replace(t, f"<mark>{t}</mark>")
-                                snippet = snippet.replace(t.capitalize(), f"<mark>{t.capitalize()}</mark>")
-                            except Exception:
-                                pass
-
-                        st.markdown(f"""
-                        <div class="candidate-card">
-                            <div style="display:flex; justify-content:space-between; align-items:center;">
-                                <div>
-                                    <h3 style="margin:0; color:#FFF;">{disp_name}</h3>
-                                    <span style="color:#AAA; font-size:0.9rem;">{disp_role}</span>
-                                </div>
-                                <div style="text-align:right;">
-                                    <span style="font-size:1.5rem; font-weight:800; color:#FFD700;">{score_pct}%</span>
-                                </div>
-                            </div>
-                            <div style="margin:10px 0;">
-                                <span class="tag">📍 {disp_loc}</span>
-                                <span class="tag">🛂 {disp_visa}</span>
-                                <span class="tag">💡 {disp_exp} Yrs Exp</span>
-                            </div>
-                            <p style=\"color:#CCC; font-size:0.95rem;\">{snippet}...</p>
-                            <div class="match-reason">ℹ️ {match_reason}</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                        c1, c2 = st.columns([1, 5])
-                        with c1:
-                            if st.button(btn_label, key=f"sl_{r.get('id')}"):
-                                toggle_shortlist({"name": disp_name, "id": r.get("id")})
-                                st.rerun()
-                        with c2:
-                            st.download_button("📄 Download JSON", data=json.dumps(r, indent=2), file_name=f"{disp_name}.json", key=f"dl_{r.get('id','unknown')}")
+                entry = get_cached_search(search_key)
+                if entry is None:
+                    try:
+                        with st.spinner("Running Hybrid Search..."):
+                            results = search_candidates(
+                                query,
+                                strictness,
+                                filters,
+                                top_k=results_count,
+                                fusion_k=float(fusion_balance),
+                            )
+                        entry = put_cached_search(search_key, results)
+                    except SearchDeadlineExceeded:
+                        st.error("⏱️ The vector DB did not answer in time. Please try again.")
+                if entry is not None:
+                    st.session_state["active_search"] = search_key
+                    st.session_state["results_page"] = 0
+
+            # Reruns (shortlist clicks, page changes) reuse the stored results
+            entry = get_cached_search(st.session_state.get("active_search"))
+            if entry is not None:
+                if entry["key"] != search_key:
+                    st.caption("Search inputs or the talent pool changed. Click **Find Candidates** to refresh.")
+                render_results(entry)
+
+            if settings.DEBUG:
+                render_debug_panel()
 
         with c_short:
             st.markdown("### ⭐ Shortlist")
@@ -222,21 +381,14 @@ def render_app():
 
             st.markdown("---")
             st.markdown("### 📤 Export Results")
-            if st.session_state.get('last_results'):
-                df_all = pd.DataFrame([
-                    {
-                        "id": x.get("id"),
-                        "name": (x.get("metadata", {}) or {}).get("name"),
-                        "role": (x.get("metadata", {}) or {}).get("role"),
-                        "location": (x.get("metadata", {}) or {}).get("location"),
-                        "visa": (x.get("metadata", {}) or {}).get("visa"),
-                        "exp": (x.get("metadata", {}) or {}).get("exp"),
-                        "score": x.get("score"),
-                    }
-                    for x in st.session_state['last_results']
-                ])
-                csv_all = df_all.to_csv(index=False).encode('utf-8')
-                st.download_button("Download Results CSV", csv_all, "results.csv", "text/csv")
+            entry = get_cached_search(st.session_state.get("active_search"))
+            if entry is not None and entry["results"]:
+                # Built once per result set, and only when asked for
+                if "csv" not in entry:
+                    if st.button("Prepare Results CSV"):
+                        entry["csv"] = results_csv(entry["results"])
+                if "csv" in entry:
+                    st.download_button("Download Results CSV", entry["csv"], "results.csv", "text/csv")
 
     with t_upload:
         st.header("Import Resumes")
@@ -256,17 +408,14 @@ def render_app():
                         st.warning("Please paste resume text.")
                     else:
                         try:
-                            col = db.get_collection()
-                            vec = EmbedderService.encode(p_text)
                             item = {
-                                "id": f"paste-{int(time.time())}",
-                                "dense_values": vec,
                                 "text": p_text,
                                 "metadata": {"name": p_name or "Candidate", "role": p_role or "Applicant", "location": p_loc or "", "visa": p_visa or "Unknown", "clearance": p_clear or "None", "exp": int(p_exp)},
                             }
-                            with col.transaction() as txn:
-                                txn.batch_upsert_vectors([item])
-                            st.success("Pasted resume indexed. Go to Talent Search to query.")
+                            if ingest_documents([item])["skipped"]:
+                                st.info("This resume is already indexed.")
+                            else:
+                                st.success("Pasted resume indexed. Go to Talent Search to query.")
                         except Exception as e:
                             st.error(f"Failed to index pasted resume: {e}")
             with c2p:
@@ -276,41 +425,25 @@ def render_app():
                         "PMP certified. US Citizen. Led teams to build scalable microservices and CI/CD pipelines."
                     )
                     try:
-                        col = db.get_collection()
-                        vec = EmbedderService.encode(sample_text)
                         item = {
-                            "id": f"sample-{int(time.time())}",
-                            "dense_values": vec,
                             "text": sample_text,
                             "metadata": {"name": "Sample Candidate", "role": "Software Engineer", "location": "Remote", "visa": "US Citizen", "clearance": "None", "exp": 7},
                         }
-                        with col.transaction() as txn:
-                            txn.batch_upsert_vectors([item])
-                        st.success("Sample resume indexed. Go to Talent Search to query.")
+                        if ingest_documents([item])["skipped"]:
+                            st.info("Sample resume is already indexed.")
+                        else:
+                            st.success("Sample resume indexed. Go to Talent Search to query.")
                     except Exception as e:
                         st.error(f"Failed to index sample resume: {e}")
-        files = st.file_uploader("", accept_multiple_files=True)
+        files = st.file_uploader("", accept_multiple_files=True, type=["pdf", "docx", "txt"])
         if files and st.button("Process Batch"):
-            try:
-                col = db.get_collection()
-            except Exception as e:
-                st.error(f"Database unavailable: {e}")
-                return
-            bar = st.progress(0)
-            batch = []
-            for i, f in enumerate(files):
-                text = extract_text_from_file(f)
-                vec = EmbedderService.encode(text)
-                visa = "US Citizen" if "US Citizen" in text else ("Asian Citizen" if "Asian" in text else "Unknown")
-                batch.append({
-                    "id": f"upl-{int(time.time())}-{i}",
-                    "dense_values": vec,
-                    "text": text,
-                    "metadata": {"name": f.name, "role": "Applicant", "visa": visa, "clearance": "None"}
-                })
-                bar.progress((i+1)/len(files))
-            
-            with col.transaction() as txn:
-                txn.batch_upsert_vectors(batch)
-            txn.poll_completion(target_status="complete", max_attempts=10)
-            st.success(f"✅ Successfully indexed {len(files)} resumes!")
\ No newline at end of file
+            # Parsing, embedding and upserting run in a background job; this
+            # session only polls its status
+            st.session_state["ingest_job"] = start_ingest_job(files)
+        job_id = st.session_state.get("ingest_job")
+        if job_id:
+            job = job_store.get(job_id)
+            if job and job["status"] in ("queued", "running"):
+                render_job_progress(job_id)
+            elif job:
+                render_job_summary(job)